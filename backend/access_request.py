@@ -5,11 +5,17 @@ import boto3
 import json
 import os
 import uuid
+from boto3.dynamodb.conditions import Attr
 from datetime import datetime
 
+from archive_store import archive_period, read_archive
+from item_codec import TEXT_FIELDS, compress_fields, decompress_fields
+
 dynamodb = boto3.resource('dynamodb')
 sns_client = boto3.client('sns')
 
+COMPRESSED_FIELDS = TEXT_FIELDS['access-requests']
+
 # Créer la table si elle n'existe pas
 table_name = os.environ.get('ACCESS_REQUESTS_TABLE', 'delphinium-access-requests')
 try:
@@ -40,7 +46,7 @@ def lambda_handler(event, context):
         if http_method == 'POST':
             return create_access_request(event)
         elif http_method == 'GET':
-            return get_access_requests()
+            return get_access_requests(event)
         else:
             return {
                 'statusCode': 405,
@@ -75,7 +81,7 @@ def create_access_request(event):
         'createdAt': timestamp
     }
 
-    table.put_item(Item=access_request)
+    table.put_item(Item=compress_fields(access_request, COMPRESSED_FIELDS))
 
     # Envoyer une notification aux administrateurs (optionnel)
     try:
@@ -97,12 +103,19 @@ def create_access_request(event):
         'body': json.dumps({'request': access_request}, default=str)
     }
 
-def get_access_requests():
-    """Récupère toutes les demandes d'accès (admin uniquement)"""
+def get_access_requests(event):
+    """
+    Récupère toutes les demandes d'accès (admin uniquement)
+    Avec archive=true, lit les demandes archivées (paramètres year, month, cursor)
+    """
     # TODO: Vérifier le rôle de l'utilisateur via le token JWT
 
-    response = table.scan()
-    requests = response.get('Items', [])
+    query_params = event.get('queryStringParameters') or {}
+    if query_params.get('archive') == 'true':
+        return get_archived_requests(query_params)
+
+    response = table.scan(FilterExpression=Attr('archivedAt').not_exists())
+    requests = [decompress_fields(request, COMPRESSED_FIELDS) for request in response.get('Items', [])]
 
     # Trier par date de création décroissante
     requests.sort(key=lambda x: x.get('createdAt', 0), reverse=True)
@@ -111,79 +124,21 @@ def get_access_requests():
         'statusCode': 200,
         'body': json.dumps({'requests': requests}, default=str)
     }
-"""
-Lambda function pour gérer les threads du newsgroup (forum de discussion)
-"""
-import boto3
-import json
-import os
-import uuid
-from datetime import datetime
-from decimal import Decimal
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'))
-
-def lambda_handler(event, context):
-    """
-    Gère les opérations CRUD sur les threads du newsgroup
-    GET: Récupérer tous les threads
-    POST: Créer un nouveau thread
-    """
-    http_method = event.get('httpMethod')
 
+def get_archived_requests(query_params):
+    """Récupère les demandes d'accès archivées d'une année (ou d'un mois) depuis S3 (page suivante via cursor)"""
     try:
-        if http_method == 'GET':
-            return get_threads()
-        elif http_method == 'POST':
-            return create_thread(event)
-        else:
-            return {
-                'statusCode': 405,
-                'body': json.dumps({'message': 'Method not allowed'})
-            }
-    except Exception as e:
+        period = archive_period(query_params)
+    except ValueError as e:
         return {
-            'statusCode': 500,
+            'statusCode': 400,
             'body': json.dumps({'error': str(e)})
         }
 
-def get_threads():
-    """Récupère tous les threads du forum"""
-    response = table.scan()
-    threads = response.get('Items', [])
-
-    # Trier par timestamp décroissant
-    threads.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+    requests, next_cursor = read_archive('access-requests', **period)
+    requests.sort(key=lambda x: x.get('createdAt', 0), reverse=True)
 
     return {
         'statusCode': 200,
-        'body': json.dumps({'threads': threads}, default=str)
-    }
-
-def create_thread(event):
-    """Crée un nouveau thread de discussion"""
-    body = json.loads(event.get('body', '{}'))
-
-    # Récupérer l'auteur depuis le token JWT (simplifié ici)
-    author = body.get('author', 'Anonymous')
-
-    thread_id = str(uuid.uuid4())
-    timestamp = int(datetime.now().timestamp() * 1000)
-
-    thread = {
-        'threadId': thread_id,
-        'title': body.get('title'),
-        'content': body.get('content'),
-        'author': author,
-        'timestamp': timestamp,
-        'replies': []
-    }
-
-    table.put_item(Item=thread)
-
-    return {
-        'statusCode': 201,
-        'body': json.dumps({'thread': thread}, default=str)
+        'body': json.dumps({'requests': requests, 'archive': True, 'truncated': next_cursor is not None, 'nextCursor': next_cursor}, default=str)
     }
-
@@ -0,0 +1,299 @@
+"""
+Lambda function (et commande) pour archiver les données anciennes
+Déplace vers S3 les incidents résolus, les threads inactifs, les événements passés
+et les demandes d'accès traitées, puis les retire des tables via le TTL DynamoDB
+"""
+import argparse
+import boto3
+import json
+import os
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+from datetime import datetime, timedelta
+
+from archive_store import delete_part, write_partition
+from item_codec import decompress_item
+from listing import LISTING_ATTRIBUTE
+
+dynamodb = boto3.resource('dynamodb')
+incidents_table = dynamodb.Table(os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents'))
+notes_table = dynamodb.Table(os.environ.get('INCIDENT_NOTES_TABLE', 'delphinium-incident-notes'))
+threads_table = dynamodb.Table(os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'))
+events_table = dynamodb.Table(os.environ.get('CALENDAR_TABLE', 'delphinium-calendar'))
+requests_table = dynamodb.Table(os.environ.get('ACCESS_REQUESTS_TABLE', 'delphinium-access-requests'))
+
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', '6'))
+EVENTS_ARCHIVE_AFTER_DAYS = int(os.environ.get('EVENTS_ARCHIVE_AFTER_DAYS', '30'))
+# Nombre d'items par fichier d'archive
+PART_ITEMS = int(os.environ.get('ARCHIVE_PART_ITEMS', '1000'))
+TTL_ATTRIBUTE = 'expiresAt'
+
+KEYS = {
+    'incidents': ['incidentId', 'createdAt'],
+    'incident-notes': ['incidentId', 'noteId'],
+    'threads': ['threadId', 'timestamp'],
+    'events': ['eventId', 'eventDate'],
+    'access-requests': ['requestId']
+}
+
+# Attributs qui changent quand l'item est modifié : l'item n'est retiré de la
+# table que s'ils sont identiques à la copie archivée (sinon il reste actif)
+VERSION_ATTRIBUTES = {
+    'incidents': ['status', 'updatedAt', 'noteCount'],
+    'incident-notes': [],
+    'threads': ['replies'],
+    'events': ['eventDate', 'updatedAt'],
+    'access-requests': ['status', 'updatedAt']
+}
+
+def lambda_handler(event, context):
+    """
+    Archive les données anciennes (déclenchement planifié ou manuel)
+    Paramètres optionnels de l'événement : kinds, months
+    """
+    try:
+        result = archive_all(
+            kinds=event.get('kinds'),
+            months=int(event.get('months', ARCHIVE_AFTER_MONTHS))
+        )
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'archive': result})
+        }
+    except Exception as e:
+        # Relancée pour que l'exécution planifiée soit comptée en échec
+        print(f"Archive failed: {e}")
+        raise
+
+def archive_all(kinds=None, months=ARCHIVE_AFTER_MONTHS, dry_run=False):
+    """Archive chaque type de données plus ancien que la limite"""
+    now = datetime.now()
+    cutoff_ms = int((now - timedelta(days=30 * months)).timestamp() * 1000)
+    events_cutoff = (now - timedelta(days=EVENTS_ARCHIVE_AFTER_DAYS)).strftime('%Y-%m-%d')
+
+    sources = {
+        'incidents': (incidents_table, lambda: archivable_incidents(cutoff_ms), date_from_ms('createdAt')),
+        'threads': (threads_table, lambda: archivable_threads(cutoff_ms), date_from_ms('timestamp')),
+        'events': (events_table, lambda: archivable_events(events_cutoff), date_from_day('eventDate')),
+        'access-requests': (requests_table, lambda: archivable_requests(cutoff_ms), date_from_ms('createdAt'))
+    }
+
+    result = {}
+    for kind in kinds or list(sources):
+        table, items, date_of = sources[kind]
+        result[kind] = archive_items(kind, table, items(), date_of, now, dry_run)
+
+    return result
+
+def archive_items(kind, table, items, date_of, now, dry_run=False):
+    """
+    Regroupe les items par mois, écrit chaque lot sur S3 puis pose le TTL
+    sur les items archivés (jamais avant que le fichier soit écrit)
+    Un item modifié entre la lecture et le marquage reste dans la table
+    et est retiré du fichier écrit ; un item à la date illisible est ignoré
+    """
+    if not dry_run:
+        ensure_ttl(table)
+
+    run = now.strftime('%Y%m%dT%H%M%S')
+    partitions = {}
+    part_numbers = {}
+    summary = {'items': 0, 'skipped': 0, 'invalidDates': 0, 'parts': []}
+
+    def flush(partition):
+        batch = partitions.pop(partition)
+        if dry_run:
+            summary['items'] += len(batch)
+            return
+
+        part = part_numbers.get(partition, 0)
+        part_numbers[partition] = part + 1
+        year, month = partition
+        name = f"{run}-part-{part:05d}"
+        key = write_partition(kind, year, month, name, batch)
+
+        archived = []
+        for item in batch:
+            if not mark_archived(table, KEYS[kind], item, now, VERSION_ATTRIBUTES[kind]):
+                continue
+            archived.append(item)
+            if kind == 'incidents':
+                for note in item.get('notes', []):
+                    if 'noteId' in note:
+                        mark_archived(notes_table, KEYS['incident-notes'], note, now)
+
+        if len(archived) < len(batch):
+            # Le fichier ne doit contenir que les items effectivement retirés de la table
+            if archived:
+                write_partition(kind, year, month, name, archived)
+            else:
+                delete_part(key)
+                key = None
+
+        summary['items'] += len(archived)
+        summary['skipped'] += len(batch) - len(archived)
+        if key:
+            summary['parts'].append(key)
+
+    for item in items:
+        # Les archives contiennent les textes en clair, sans l'attribut de l'index des listes
+        item = decompress_item(item)
+        item.pop(LISTING_ATTRIBUTE, None)
+        try:
+            date = date_of(item)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Archive {kind}: invalid date for {[item.get(name) for name in KEYS[kind]]}: {e}")
+            summary['invalidDates'] += 1
+            continue
+        partition = (date.year, date.month)
+        partitions.setdefault(partition, []).append(item)
+
+        if len(partitions[partition]) >= PART_ITEMS:
+            flush(partition)
+
+    for partition in list(partitions):
+        flush(partition)
+
+    return summary
+
+def archivable_incidents(cutoff_ms):
+    """Incidents résolus sans activité depuis la limite, avec toutes leurs notes"""
+    filter_expression = (
+        Attr('status').eq('resolved')
+        & Attr('archivedAt').not_exists()
+        & (
+            Attr('updatedAt').lt(cutoff_ms)
+            | (Attr('updatedAt').not_exists() & Attr('createdAt').lt(cutoff_ms))
+        )
+    )
+
+    for incident in scan_items(incidents_table, filter_expression):
+        incident['notes'] = incident.get('notes', []) + list(query_notes(incident['incidentId']))
+        yield incident
+
+def archivable_threads(cutoff_ms):
+    """Threads sans message ni réponse depuis la limite"""
+    filter_expression = Attr('timestamp').lt(cutoff_ms) & Attr('archivedAt').not_exists()
+
+    for thread in scan_items(threads_table, filter_expression):
+        last_activity = max(
+            [thread.get('timestamp', 0)]
+            + [reply.get('timestamp', 0) for reply in thread.get('replies', [])]
+        )
+        if last_activity < cutoff_ms:
+            yield thread
+
+def archivable_events(cutoff_date):
+    """Événements passés depuis plus de EVENTS_ARCHIVE_AFTER_DAYS jours"""
+    filter_expression = Attr('eventDate').lt(cutoff_date) & Attr('archivedAt').not_exists()
+    yield from scan_items(events_table, filter_expression)
+
+def archivable_requests(cutoff_ms):
+    """Demandes d'accès traitées (acceptées ou refusées) avant la limite"""
+    filter_expression = (
+        Attr('status').ne('pending')
+        & Attr('createdAt').lt(cutoff_ms)
+        & Attr('archivedAt').not_exists()
+    )
+    yield from scan_items(requests_table, filter_expression)
+
+def scan_items(table, filter_expression):
+    """Parcourt toute la table page par page"""
+    scan_kwargs = {'FilterExpression': filter_expression}
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield from response.get('Items', [])
+
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def query_notes(incident_id):
+    """Récupère toutes les notes d'un incident"""
+    query_kwargs = {'KeyConditionExpression': Key('incidentId').eq(incident_id)}
+
+    while True:
+        response = notes_table.query(**query_kwargs)
+        yield from response.get('Items', [])
+
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def mark_archived(table, key_names, item, now, version_attributes=()):
+    """
+    Marque l'item comme archivé ; DynamoDB le supprimera via le TTL
+    Seulement s'il n'a pas changé depuis sa lecture (attributs de version, taille
+    des listes) : renvoie False s'il a été modifié ou supprimé entre-temps
+    """
+    conditions = [f"attribute_exists({key_names[0]})", 'attribute_not_exists(archivedAt)']
+    names = {}
+    values = {
+        ':expiresAt': int(now.timestamp()),
+        ':archivedAt': int(now.timestamp() * 1000)
+    }
+
+    for index, attribute in enumerate(version_attributes):
+        name = f"#v{index}"
+        names[name] = attribute
+        if attribute not in item:
+            conditions.append(f"attribute_not_exists({name})")
+        elif isinstance(item[attribute], list):
+            conditions.append(f"size({name}) = :v{index}")
+            values[f":v{index}"] = len(item[attribute])
+        else:
+            conditions.append(f"{name} = :v{index}")
+            values[f":v{index}"] = item[attribute]
+
+    update = {
+        'Key': {name: item[name] for name in key_names},
+        # Un item archivé sort aussi des listes de la page d'accueil
+        'UpdateExpression': f"SET {TTL_ATTRIBUTE} = :expiresAt, archivedAt = :archivedAt REMOVE {LISTING_ATTRIBUTE}",
+        'ConditionExpression': ' AND '.join(conditions),
+        'ExpressionAttributeValues': values
+    }
+    if names:
+        update['ExpressionAttributeNames'] = names
+
+    try:
+        table.update_item(**update)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+def ensure_ttl(table):
+    """Active le TTL sur la table si ce n'est pas déjà fait"""
+    client = dynamodb.meta.client
+    description = client.describe_time_to_live(TableName=table.name)['TimeToLiveDescription']
+
+    if description.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING'):
+        return
+
+    client.update_time_to_live(
+        TableName=table.name,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': TTL_ATTRIBUTE}
+    )
+
+def date_from_ms(attribute):
+    """Date de partition à partir d'un horodatage en millisecondes"""
+    return lambda item: datetime.fromtimestamp(int(item.get(attribute, 0)) / 1000)
+
+def date_from_day(attribute):
+    """Date de partition à partir d'une date AAAA-MM-JJ"""
+    return lambda item: datetime.strptime(item[attribute][:10], '%Y-%m-%d')
+
+def main():
+    parser = argparse.ArgumentParser(description='Archivage des données anciennes vers S3')
+    parser.add_argument('--kinds', nargs='+', choices=['incidents', 'threads', 'events', 'access-requests'])
+    parser.add_argument('--months', type=int, default=ARCHIVE_AFTER_MONTHS)
+    parser.add_argument('--dry-run', action='store_true', help='Compter sans archiver')
+    args = parser.parse_args()
+
+    result = archive_all(kinds=args.kinds, months=args.months, dry_run=args.dry_run)
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
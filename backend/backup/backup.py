@@ -0,0 +1,268 @@
+"""
+Lambda function (et commande) pour exporter et restaurer les tables DynamoDB
+Export par scan parallèle segmenté vers des fichiers JSONL compressés (gzip) sur S3
+"""
+import argparse
+import base64
+import gzip
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+
+# Client bas niveau : les items restent au format DynamoDB ({"S": ...}),
+# ce qui conserve exactement les types (nombres, binaires, ensembles)
+dynamodb_client = boto3.client('dynamodb')
+s3_client = boto3.client('s3')
+bucket_name = os.environ.get('BACKUP_BUCKET', 'delphinium-backups')
+
+TABLES = {
+    'newsgroup': os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'),
+    'blog': os.environ.get('BLOG_TABLE', 'delphinium-blog'),
+    'calendar': os.environ.get('CALENDAR_TABLE', 'delphinium-calendar'),
+    'incidents': os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents'),
+    'incident-notes': os.environ.get('INCIDENT_NOTES_TABLE', 'delphinium-incident-notes'),
+    'access-requests': os.environ.get('ACCESS_REQUESTS_TABLE', 'delphinium-access-requests'),
+    'documents': os.environ.get('DOCUMENTS_TABLE', 'delphinium-documents')
+}
+
+TOTAL_SEGMENTS = int(os.environ.get('BACKUP_SEGMENTS', '8'))
+# Taille maximale (non compressée) d'un fichier JSONL avant d'en commencer un nouveau
+CHUNK_BYTES = int(os.environ.get('BACKUP_CHUNK_BYTES', str(32 * 1024 * 1024)))
+
+def lambda_handler(event, context):
+    """
+    Exporte les tables vers S3 (déclenchement planifié ou manuel)
+    Paramètres optionnels de l'événement : tables, segments
+    """
+    try:
+        manifest = export_tables(
+            tables=event.get('tables'),
+            segments=int(event.get('segments', TOTAL_SEGMENTS))
+        )
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'backup': manifest})
+        }
+    except Exception as e:
+        # Une sauvegarde nocturne échouée doit être vue comme une erreur par Lambda (alarme, nouvelle tentative)
+        print(f"Backup failed: {e}")
+        raise
+
+def export_tables(tables=None, segments=TOTAL_SEGMENTS, workers=None):
+    """
+    Exporte les tables demandées sous backups/<horodatage>/
+    Chaque segment de chaque table est traité par un worker du pool
+    """
+    tables = tables or list(TABLES)
+    prefix = f"backups/{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+
+    tasks = [
+        (table_key, segment)
+        for table_key in tables
+        for segment in range(segments)
+    ]
+
+    with ThreadPoolExecutor(max_workers=workers or segments) as pool:
+        results = list(pool.map(
+            lambda task: export_segment(prefix, task[0], task[1], segments),
+            tasks
+        ))
+
+    manifest = {
+        'prefix': prefix,
+        'createdAt': int(datetime.now().timestamp() * 1000),
+        'segments': segments,
+        'tables': {}
+    }
+    for table_key, parts, count in results:
+        entry = manifest['tables'].setdefault(table_key, {
+            'tableName': TABLES[table_key],
+            'itemCount': 0,
+            'parts': []
+        })
+        entry['itemCount'] += count
+        entry['parts'].extend(parts)
+
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=f"{prefix}/manifest.json",
+        Body=json.dumps(manifest).encode('utf-8'),
+        ContentType='application/json'
+    )
+
+    return manifest
+
+def export_segment(prefix, table_key, segment, total_segments):
+    """Exporte un segment d'une table, fichier par fichier"""
+    lines = encode_lines(scan_segment(TABLES[table_key], segment, total_segments))
+
+    parts = []
+    count = 0
+    for part, (body, part_count) in enumerate(compress_chunks(lines)):
+        key = f"{prefix}/{table_key}/segment-{segment:03d}-part-{part:05d}.jsonl.gz"
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=key,
+            Body=body,
+            ContentType='application/x-ndjson',
+            ContentEncoding='gzip'
+        )
+        parts.append(key)
+        count += part_count
+
+    return table_key, parts, count
+
+def scan_segment(table_name, segment, total_segments):
+    """Parcourt un segment de la table page par page (une seule page en mémoire)"""
+    scan_kwargs = {
+        'TableName': table_name,
+        'Segment': segment,
+        'TotalSegments': total_segments
+    }
+
+    while True:
+        response = dynamodb_client.scan(**scan_kwargs)
+        yield from response.get('Items', [])
+
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def encode_lines(items):
+    """Transforme les items DynamoDB en lignes JSONL"""
+    for item in items:
+        line = json.dumps(
+            {name: encode_value(value) for name, value in item.items()},
+            ensure_ascii=False
+        )
+        yield (line + '\n').encode('utf-8')
+
+def compress_chunks(lines):
+    """Regroupe les lignes en fichiers gzip d'au plus CHUNK_BYTES non compressés"""
+    buffer = io.BytesIO()
+    archive = gzip.GzipFile(fileobj=buffer, mode='wb')
+    size = 0
+    count = 0
+
+    for line in lines:
+        archive.write(line)
+        size += len(line)
+        count += 1
+
+        if size >= CHUNK_BYTES:
+            archive.close()
+            yield buffer.getvalue(), count
+            buffer = io.BytesIO()
+            archive = gzip.GzipFile(fileobj=buffer, mode='wb')
+            size = 0
+            count = 0
+
+    archive.close()
+    if count:
+        yield buffer.getvalue(), count
+
+def encode_value(value):
+    """Encode une valeur DynamoDB en JSON (les binaires passent en base64)"""
+    (kind, data), = value.items()
+
+    if kind == 'B':
+        return {'B': base64.b64encode(data).decode('ascii')}
+    if kind == 'BS':
+        return {'BS': [base64.b64encode(b).decode('ascii') for b in data]}
+    if kind == 'M':
+        return {'M': {k: encode_value(v) for k, v in data.items()}}
+    if kind == 'L':
+        return {'L': [encode_value(v) for v in data]}
+    return value
+
+def decode_value(value):
+    """Inverse de encode_value"""
+    (kind, data), = value.items()
+
+    if kind == 'B':
+        return {'B': base64.b64decode(data)}
+    if kind == 'BS':
+        return {'BS': [base64.b64decode(b) for b in data]}
+    if kind == 'M':
+        return {'M': {k: decode_value(v) for k, v in data.items()}}
+    if kind == 'L':
+        return {'L': [decode_value(v) for v in data]}
+    return value
+
+def restore_tables(prefix, tables=None, target_tables=None, workers=TOTAL_SEGMENTS):
+    """
+    Restaure une sauvegarde à partir de son manifest
+    target_tables permet de restaurer vers d'autres tables ({'blog': 'delphinium-blog-restore'})
+    """
+    response = s3_client.get_object(Bucket=bucket_name, Key=f"{prefix}/manifest.json")
+    manifest = json.loads(response['Body'].read())
+
+    target_tables = target_tables or {}
+    tasks = [
+        (target_tables.get(table_key, entry['tableName']), key)
+        for table_key, entry in manifest['tables'].items()
+        if not tables or table_key in tables
+        for key in entry['parts']
+    ]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(lambda task: restore_part(*task), tasks))
+
+    return {'prefix': prefix, 'parts': len(tasks), 'itemCount': sum(counts)}
+
+def restore_part(table_name, key):
+    """Relit un fichier JSONL en flux et réécrit ses items par lots"""
+    response = s3_client.get_object(Bucket=bucket_name, Key=key)
+    deserializer = TypeDeserializer()
+
+    # Une ressource par worker : les ressources boto3 ne sont pas thread-safe
+    table = boto3.session.Session().resource('dynamodb').Table(table_name)
+    count = 0
+
+    with gzip.GzipFile(fileobj=response['Body'], mode='rb') as archive:
+        with table.batch_writer() as batch:
+            for line in io.TextIOWrapper(archive, encoding='utf-8'):
+                if not line.strip():
+                    continue
+                item = {
+                    name: deserializer.deserialize(decode_value(value))
+                    for name, value in json.loads(line).items()
+                }
+                batch.put_item(Item=item)
+                count += 1
+
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Sauvegarde des tables Delphinium')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Exporter les tables vers S3')
+    export_parser.add_argument('--tables', nargs='+', choices=list(TABLES))
+    export_parser.add_argument('--segments', type=int, default=TOTAL_SEGMENTS)
+
+    restore_parser = subparsers.add_parser('restore', help='Restaurer une sauvegarde')
+    restore_parser.add_argument('prefix', help='Préfixe de la sauvegarde (backups/<horodatage>)')
+    restore_parser.add_argument('--tables', nargs='+', choices=list(TABLES))
+    restore_parser.add_argument('--target', action='append', default=[],
+                                metavar='TABLE=NOM', help='Table de destination')
+    restore_parser.add_argument('--workers', type=int, default=TOTAL_SEGMENTS)
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        result = export_tables(tables=args.tables, segments=args.segments)
+    else:
+        target_tables = dict(target.split('=', 1) for target in args.target)
+        result = restore_tables(args.prefix, tables=args.tables,
+                                target_tables=target_tables, workers=args.workers)
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -7,9 +7,14 @@ import os
 import uuid
 from datetime import datetime
 
+from item_codec import TEXT_FIELDS, compress_fields, decompress_fields
+from listing import LISTING_ATTRIBUTE, POSTS_LISTING, query_listing
+
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ.get('BLOG_TABLE', 'delphinium-blog'))
 
+COMPRESSED_FIELDS = TEXT_FIELDS['posts']
+
 def lambda_handler(event, context):
     """
     Gère les opérations CRUD sur les posts du blog
@@ -39,6 +44,11 @@ def get_posts():
     response = table.scan()
     posts = response.get('Items', [])
 
+    for post in posts:
+        # Attribut interne de l'index des listes, non renvoyé au client
+        post.pop(LISTING_ATTRIBUTE, None)
+        decompress_fields(post, COMPRESSED_FIELDS)
+
     # Trier par date de création décroissante
     posts.sort(key=lambda x: x.get('createdAt', 0), reverse=True)
 
@@ -47,6 +57,13 @@ def get_posts():
         'body': json.dumps({'posts': posts}, default=str)
     }
 
+def list_latest_posts(limit):
+    """Récupère les derniers posts, sans leur contenu (page d'accueil)"""
+    return query_listing(
+        table, POSTS_LISTING, 'createdAt', limit,
+        ['postId', 'title', 'summary', 'author', 'category', 'imageUrl', 'createdAt']
+    )
+
 def create_post(event):
     """Crée un nouveau post de blog (admin uniquement)"""
     # TODO: Vérifier le rôle de l'utilisateur via le token JWT
@@ -67,7 +84,7 @@ def create_post(event):
         'createdAt': timestamp
     }
 
-    table.put_item(Item=post)
+    table.put_item(Item={**compress_fields(post, COMPRESSED_FIELDS), LISTING_ATTRIBUTE: POSTS_LISTING})
 
     return {
         'statusCode': 201,
@@ -5,8 +5,12 @@ import boto3
 import json
 import os
 import uuid
+from boto3.dynamodb.conditions import Attr
 from datetime import datetime
 
+from archive_store import archive_period, read_archive
+from listing import EVENTS_LISTING, LISTING_ATTRIBUTE, query_listing
+
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ.get('CALENDAR_TABLE', 'delphinium-calendar'))
 
@@ -35,13 +39,21 @@ def lambda_handler(event, context):
         }
 
 def get_events(event):
-    """Récupère les événements filtrés par mois et année"""
-    query_params = event.get('queryStringParameters', {})
+    """
+    Récupère les événements filtrés par mois et année
+    Avec archive=true, lit les événements archivés de ce mois ou de cette année
+    """
+    query_params = event.get('queryStringParameters') or {}
     year = query_params.get('year')
     month = query_params.get('month')
 
-    response = table.scan()
+    if query_params.get('archive') == 'true':
+        return get_archived_events(query_params)
+
+    response = table.scan(FilterExpression=Attr('archivedAt').not_exists())
     events = response.get('Items', [])
+    for calendar_event in events:
+        calendar_event.pop(LISTING_ATTRIBUTE, None)
 
     # Filtrer par mois/année si spécifié
     if year and month:
@@ -58,6 +70,34 @@ def get_events(event):
         'body': json.dumps({'events': events}, default=str)
     }
 
+def get_archived_events(query_params):
+    """Récupère les événements archivés d'une année (ou d'un mois) depuis S3 (page suivante via cursor)"""
+    try:
+        period = archive_period(query_params)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    events, next_cursor = read_archive('events', **period)
+    events.sort(key=lambda x: x.get('eventDate', ''))
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'events': events, 'archive': True, 'truncated': next_cursor is not None, 'nextCursor': next_cursor}, default=str)
+    }
+
+def list_upcoming_events(limit):
+    """Récupère les prochains événements à partir d'aujourd'hui (page d'accueil)"""
+    events = query_listing(
+        table, EVENTS_LISTING, 'eventDate', limit,
+        ['eventId', 'title', 'eventDate', 'time', 'location'],
+        newest_first=False, start=datetime.now().strftime('%Y-%m-%d')
+    )
+    events.sort(key=lambda x: (x.get('eventDate', ''), x.get('time') or ''))
+    return events
+
 def create_event(event):
     """Crée un nouvel événement (admin uniquement)"""
     # TODO: Vérifier le rôle de l'utilisateur via le token JWT
@@ -76,7 +116,7 @@ def create_event(event):
         'createdBy': body.get('author', 'Admin')
     }
 
-    table.put_item(Item=calendar_event)
+    table.put_item(Item={**calendar_event, LISTING_ATTRIBUTE: EVENTS_LISTING})
 
     return {
         'statusCode': 201,
@@ -0,0 +1,104 @@
+"""
+Lambda function pour la page d'accueil (tableau de bord)
+Agrège en un seul appel les derniers posts, les prochains événements,
+les incidents ouverts et les derniers threads du newsgroup
+"""
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from pagination import page_limit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 20
+# Temps maximal accordé à chaque section avant de la renvoyer vide
+SECTION_TIMEOUT = float(os.environ.get('DASHBOARD_SECTION_TIMEOUT', '2'))
+
+def load_module(name, relative_path):
+    """
+    Charge un module Lambda voisin depuis son fichier
+    (le dossier calendar/ masquerait le module standard du même nom)
+    """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+posts = load_module('blog_posts', 'blog/posts.py')
+events = load_module('calendar_events', 'calendar/events.py')
+incidents = load_module('incidents_incidents', 'incidents/incidents.py')
+threads = load_module('newsgroup_threads', 'newsgroup/threads.py')
+
+SECTIONS = {
+    'posts': posts.list_latest_posts,
+    'events': events.list_upcoming_events,
+    'incidents': incidents.list_open_incidents,
+    'threads': threads.list_recent_threads
+}
+
+def lambda_handler(event, context):
+    """
+    Renvoie le tableau de bord de la page d'accueil
+    GET /dashboard?limit=5
+    """
+    if event.get('httpMethod') != 'GET':
+        return {
+            'statusCode': 405,
+            'body': json.dumps({'message': 'Method not allowed'})
+        }
+
+    query_params = event.get('queryStringParameters') or {}
+    try:
+        limit = page_limit(query_params, DEFAULT_LIMIT, MAX_LIMIT)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    try:
+        return {
+            'statusCode': 200,
+            'body': json.dumps(get_dashboard(limit), default=str)
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def get_dashboard(limit):
+    """
+    Interroge toutes les sections en parallèle
+    Une section en erreur ou trop lente est renvoyée vide et listée dans 'degraded'
+    """
+    dashboard = {'degraded': []}
+    pool = ThreadPoolExecutor(max_workers=len(SECTIONS))
+    deadline = time.monotonic() + SECTION_TIMEOUT
+
+    try:
+        futures = {
+            name: pool.submit(section, limit)
+            for name, section in SECTIONS.items()
+        }
+
+        for name, future in futures.items():
+            try:
+                dashboard[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                print(f"Dashboard section {name} timed out")
+                dashboard[name] = []
+                dashboard['degraded'].append(name)
+            except Exception as e:
+                print(f"Error loading dashboard section {name}: {e}")
+                dashboard[name] = []
+                dashboard['degraded'].append(name)
+    finally:
+        # Ne pas attendre les sections en retard
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return dashboard
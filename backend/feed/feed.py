@@ -0,0 +1,63 @@
+"""
+Lambda function pour lire le fil d'actualité (nouveautés du site)
+"""
+import boto3
+import json
+import os
+from boto3.dynamodb.conditions import Key
+
+from pagination import encode_cursor, page_params
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table(os.environ.get('FEED_TABLE', 'delphinium-feed'))
+
+FEED_ID = 'all'
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def lambda_handler(event, context):
+    """
+    Récupère le fil d'actualité, les entrées les plus récentes d'abord
+    GET /feed?limit=20&cursor=...
+    """
+    if event.get('httpMethod') != 'GET':
+        return {
+            'statusCode': 405,
+            'body': json.dumps({'message': 'Method not allowed'})
+        }
+
+    try:
+        return get_feed(event)
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def get_feed(event):
+    """Une seule requête sur la partition du fil, paginée par curseur"""
+    query_params = event.get('queryStringParameters') or {}
+    try:
+        limit, start_key = page_params(query_params, PAGE_SIZE, MAX_PAGE_SIZE, {'feedId': FEED_ID}, 'entryId')
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    query_kwargs = {
+        'KeyConditionExpression': Key('feedId').eq(FEED_ID),
+        'ProjectionExpression': 'entryId, #type, #timestamp, title, author, excerpt, #ref',
+        'ExpressionAttributeNames': {'#type': 'type', '#timestamp': 'timestamp', '#ref': 'ref'},
+        'ScanIndexForward': False,
+        'Limit': limit
+    }
+    if start_key:
+        query_kwargs['ExclusiveStartKey'] = start_key
+
+    response = table.query(**query_kwargs)
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'entries': response.get('Items', []), 'nextCursor': encode_cursor(response)}, default=str)
+    }
@@ -0,0 +1,143 @@
+"""
+Lambda function pour alimenter le fil d'actualité à partir des flux DynamoDB
+Chaque écriture intéressante (post, thread, réponse, événement, changement de
+statut d'un incident, document) devient une entrée compacte de la table du fil
+"""
+import base64
+import boto3
+import os
+from boto3.dynamodb.types import TypeDeserializer
+from datetime import datetime, timedelta
+
+from item_codec import decompress_item
+
+dynamodb = boto3.resource('dynamodb')
+feed_table = dynamodb.Table(os.environ.get('FEED_TABLE', 'delphinium-feed'))
+
+BLOG_TABLE = os.environ.get('BLOG_TABLE', 'delphinium-blog')
+NEWSGROUP_TABLE = os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup')
+CALENDAR_TABLE = os.environ.get('CALENDAR_TABLE', 'delphinium-calendar')
+INCIDENTS_TABLE = os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents')
+DOCUMENTS_TABLE = os.environ.get('DOCUMENTS_TABLE', 'delphinium-documents')
+
+# Toutes les entrées partagent la même partition : une seule requête pour lire le fil
+FEED_ID = 'all'
+EXCERPT_LENGTH = 160
+RETENTION_DAYS = int(os.environ.get('FEED_RETENTION_DAYS', '90'))
+
+deserializer = TypeDeserializer()
+
+def lambda_handler(event, context):
+    """
+    Traite un lot d'enregistrements du flux
+    Les clés des entrées sont dérivées de l'eventID de l'enregistrement :
+    en cas de nouvelle tentative, les mêmes entrées sont réécrites à l'identique
+    """
+    entries = [
+        entry
+        for record in event.get('Records', [])
+        for entry in build_entries(record)
+    ]
+
+    with feed_table.batch_writer(overwrite_by_pkeys=['feedId', 'entryId']) as batch:
+        for entry in entries:
+            batch.put_item(Item=entry)
+
+    print(f"Feed: {len(entries)} entries from {len(event.get('Records', []))} records")
+    return {'entries': len(entries)}
+
+def build_entries(record):
+    """Transforme un enregistrement du flux en zéro, une ou plusieurs entrées"""
+    if record.get('eventName') not in ('INSERT', 'MODIFY'):
+        return []
+
+    table_name = record['eventSourceARN'].split(':table/')[1].split('/')[0]
+    stream_record = record['dynamodb']
+    new = deserialize(stream_record.get('NewImage', {}))
+    old = deserialize(stream_record.get('OldImage', {}))
+    inserted = record['eventName'] == 'INSERT'
+    # Horodatage par défaut : date de l'écriture dans la table
+    written_at = int(stream_record.get('ApproximateCreationDateTime', datetime.now().timestamp()) * 1000)
+
+    entries = []
+
+    if table_name == BLOG_TABLE and inserted:
+        entries.append(entry('post', new.get('createdAt', written_at), new.get('title'),
+                             new.get('author'), new.get('summary') or new.get('content'),
+                             {'postId': new.get('postId')}))
+
+    elif table_name == NEWSGROUP_TABLE and inserted:
+        entries.append(entry('thread', new.get('timestamp', written_at), new.get('title'),
+                             new.get('author'), new.get('content'),
+                             {'threadId': new.get('threadId')}))
+
+    elif table_name == NEWSGROUP_TABLE:
+        known_replies = {reply.get('replyId') for reply in old.get('replies', [])}
+        for reply in new.get('replies', []):
+            if reply.get('replyId') not in known_replies:
+                entries.append(entry('reply', reply.get('timestamp', written_at), new.get('title'),
+                                     reply.get('author'), reply.get('content'),
+                                     {'threadId': new.get('threadId'), 'replyId': reply.get('replyId')}))
+
+    elif table_name == CALENDAR_TABLE and inserted:
+        entries.append(entry('event', written_at, new.get('title'),
+                             new.get('createdBy'), new.get('description'),
+                             {'eventId': new.get('eventId'), 'eventDate': new.get('eventDate')}))
+
+    elif table_name == INCIDENTS_TABLE and not inserted:
+        if old.get('status') != new.get('status'):
+            entries.append(entry('incident_status', new.get('updatedAt', written_at), new.get('title'),
+                                 new.get('assignedTo'), None,
+                                 {'incidentId': new.get('incidentId'), 'status': new.get('status')}))
+
+    elif table_name == DOCUMENTS_TABLE and inserted:
+        entries.append(entry('document', new.get('uploadedAt', written_at), new.get('name') or new.get('fileName'),
+                             new.get('uploadedBy'), new.get('description'),
+                             {'documentId': new.get('documentId'), 'category': new.get('category')}))
+
+    for index, feed_entry in enumerate(entries):
+        feed_entry['entryId'] = f"{feed_entry['timestamp']:013d}#{record['eventID']}#{index}"
+
+    return entries
+
+def entry(entry_type, timestamp, title, author, text, ref):
+    """Construit une entrée compacte du fil"""
+    timestamp = int(timestamp)
+    expires_at = datetime.fromtimestamp(timestamp / 1000) + timedelta(days=RETENTION_DAYS)
+
+    feed_entry = {
+        'feedId': FEED_ID,
+        'type': entry_type,
+        'timestamp': timestamp,
+        'title': title,
+        'author': author,
+        'ref': {key: value for key, value in ref.items() if value is not None},
+        'expiresAt': int(expires_at.timestamp())
+    }
+    if text:
+        feed_entry['excerpt'] = text[:EXCERPT_LENGTH]
+
+    return feed_entry
+
+def deserialize(image):
+    """Convertit une image du flux (format DynamoDB) en dictionnaire Python"""
+    return decompress_item({
+        name: deserializer.deserialize(decode_binary(value))
+        for name, value in image.items()
+    })
+
+def decode_binary(value):
+    """
+    Décode les valeurs binaires (B, BS) d'une valeur du flux, y compris dans
+    les listes et maps : l'événement Lambda les transmet encodées en base64
+    """
+    (kind, data), = value.items()
+    if kind == 'B':
+        return {'B': base64.b64decode(data)}
+    if kind == 'BS':
+        return {'BS': [base64.b64decode(v) for v in data]}
+    if kind == 'M':
+        return {'M': {name: decode_binary(v) for name, v in data.items()}}
+    if kind == 'L':
+        return {'L': [decode_binary(v) for v in data]}
+    return value
@@ -5,10 +5,30 @@ import boto3
 import json
 import os
 import uuid
+from boto3.dynamodb.conditions import Attr, Key
 from datetime import datetime
 
+from archive_store import archive_period, read_archive
+from item_codec import TEXT_FIELDS, compress_fields, decompress_fields
+from listing import LISTING_ATTRIBUTE, OPEN_INCIDENTS_LISTING, query_listing
+from pagination import encode_cursor, page_params
+
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents'))
+notes_table = dynamodb.Table(os.environ.get('INCIDENT_NOTES_TABLE', 'delphinium-incident-notes'))
+
+NOTES_PAGE_SIZE = 20
+NOTES_MAX_PAGE_SIZE = 100
+NOTE_PREVIEW_LENGTH = 200
+
+COMPRESSED_FIELDS = TEXT_FIELDS['incidents']
+NOTE_COMPRESSED_FIELDS = TEXT_FIELDS['incident-notes']
+
+# Attributs renvoyés par la liste des incidents (les notes sont chargées à part)
+INCIDENT_ATTRIBUTES = [
+    'incidentId', 'title', 'description', 'priority', 'status', 'createdAt',
+    'createdBy', 'assignedTo', 'updatedAt', 'noteCount', 'lastNote'
+]
 
 def lambda_handler(event, context):
     """
@@ -16,12 +36,19 @@ def lambda_handler(event, context):
     GET: Récupérer tous les incidents
     POST: Créer un nouvel incident
     PUT: Mettre à jour un incident (statut, priorité)
+    GET /incidents/{incidentId}/notes: Récupérer les notes (paginées)
+    POST /incidents/{incidentId}/notes: Ajouter une note
     """
     http_method = event.get('httpMethod')
+    path = event.get('path', '')
 
     try:
-        if http_method == 'GET':
-            return get_incidents()
+        if path.endswith('/notes') and http_method == 'GET':
+            return get_notes(event)
+        elif path.endswith('/notes') and http_method == 'POST':
+            return create_note(event)
+        elif http_method == 'GET':
+            return get_incidents(event)
         elif http_method == 'POST':
             return create_incident(event)
         elif http_method == 'PUT':
@@ -37,10 +64,21 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def get_incidents():
-    """Récupère tous les incidents"""
-    response = table.scan()
-    incidents = response.get('Items', [])
+def get_incidents(event):
+    """
+    Récupère tous les incidents (sans leurs notes)
+    Avec archive=true, lit les incidents archivés (paramètres year, month, cursor)
+    """
+    query_params = event.get('queryStringParameters') or {}
+    if query_params.get('archive') == 'true':
+        return get_archived_incidents(query_params)
+
+    response = table.scan(
+        FilterExpression=Attr('archivedAt').not_exists(),
+        ProjectionExpression=', '.join(f"#{name}" for name in INCIDENT_ATTRIBUTES),
+        ExpressionAttributeNames={f"#{name}": name for name in INCIDENT_ATTRIBUTES}
+    )
+    incidents = [decompress_fields(incident, COMPRESSED_FIELDS) for incident in response.get('Items', [])]
 
     # Trier par date de création décroissante
     incidents.sort(key=lambda x: x.get('createdAt', 0), reverse=True)
@@ -50,6 +88,31 @@ def get_incidents():
         'body': json.dumps({'incidents': incidents}, default=str)
     }
 
+def list_open_incidents(limit):
+    """Récupère les derniers incidents non résolus (page d'accueil)"""
+    return query_listing(
+        table, OPEN_INCIDENTS_LISTING, 'createdAt', limit,
+        ['incidentId', 'title', 'priority', 'status', 'createdAt', 'noteCount']
+    )
+
+def get_archived_incidents(query_params):
+    """Récupère les incidents archivés d'une année (ou d'un mois) depuis S3 (page suivante via cursor)"""
+    try:
+        period = archive_period(query_params)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    incidents, next_cursor = read_archive('incidents', **period)
+    incidents.sort(key=lambda x: x.get('createdAt', 0), reverse=True)
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'incidents': incidents, 'archive': True, 'truncated': next_cursor is not None, 'nextCursor': next_cursor}, default=str)
+    }
+
 def create_incident(event):
     """Crée un nouvel incident (admin uniquement)"""
     # TODO: Vérifier le rôle de l'utilisateur via le token JWT
@@ -68,10 +131,13 @@ def create_incident(event):
         'createdAt': timestamp,
         'createdBy': body.get('author', 'Admin'),
         'assignedTo': body.get('assignedTo'),
-        'notes': []
+        'noteCount': 0
     }
 
-    table.put_item(Item=incident)
+    item = compress_fields(incident, COMPRESSED_FIELDS)
+    if incident['status'] != 'resolved':
+        item[LISTING_ATTRIBUTE] = OPEN_INCIDENTS_LISTING
+    table.put_item(Item=item)
 
     return {
         'statusCode': 201,
@@ -91,38 +157,182 @@ def update_incident(event):
     body = json.loads(event.get('body', '{}'))
 
     # Récupérer l'incident existant
-    response = table.get_item(Key={'incidentId': incident_id})
+    incident = find_incident(incident_id)
 
-    if 'Item' not in response:
+    if not incident:
         return {
             'statusCode': 404,
             'body': json.dumps({'error': 'Incident not found'})
         }
 
-    incident = response['Item']
-
     # Mettre à jour les champs
-    if 'status' in body:
-        incident['status'] = body['status']
-    if 'priority' in body:
-        incident['priority'] = body['priority']
-    if 'assignedTo' in body:
-        incident['assignedTo'] = body['assignedTo']
-    if 'note' in body:
-        if 'notes' not in incident:
-            incident['notes'] = []
-        incident['notes'].append({
-            'timestamp': int(datetime.now().timestamp() * 1000),
-            'author': body.get('author', 'Admin'),
-            'note': body['note']
-        })
+    changes = {
+        field: body[field]
+        for field in ('status', 'priority', 'assignedTo')
+        if field in body
+    }
 
-    incident['updatedAt'] = int(datetime.now().timestamp() * 1000)
+    note = None
+    if 'note' in body:
+        note = build_note(incident_id, body)
 
-    table.put_item(Item=incident)
+    incident = write_incident_update(incident, changes, note)
 
     return {
         'statusCode': 200,
         'body': json.dumps({'incident': incident}, default=str)
     }
 
+def get_notes(event):
+    """
+    Récupère les notes d'un incident, les plus récentes d'abord
+    Paramètres: limit, cursor (renvoyé par la page précédente)
+    """
+    incident_id = event.get('pathParameters', {}).get('incidentId')
+
+    if not incident_id:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Incident ID required'})
+        }
+
+    query_params = event.get('queryStringParameters') or {}
+    try:
+        limit, start_key = page_params(query_params, NOTES_PAGE_SIZE, NOTES_MAX_PAGE_SIZE,
+                                       {'incidentId': incident_id}, 'noteId')
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    query_kwargs = {
+        'KeyConditionExpression': Key('incidentId').eq(incident_id),
+        'ScanIndexForward': False,
+        'Limit': limit
+    }
+    if start_key:
+        query_kwargs['ExclusiveStartKey'] = start_key
+
+    response = notes_table.query(**query_kwargs)
+    notes = [decompress_fields(note, NOTE_COMPRESSED_FIELDS) for note in response.get('Items', [])]
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'notes': notes, 'nextCursor': encode_cursor(response)}, default=str)
+    }
+
+def create_note(event):
+    """Ajoute une note à un incident"""
+    incident_id = event.get('pathParameters', {}).get('incidentId')
+
+    if not incident_id:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Incident ID required'})
+        }
+
+    body = json.loads(event.get('body', '{}'))
+
+    if not body.get('note'):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Note required'})
+        }
+
+    incident = find_incident(incident_id)
+
+    if not incident:
+        return {
+            'statusCode': 404,
+            'body': json.dumps({'error': 'Incident not found'})
+        }
+
+    note = build_note(incident_id, body)
+    write_incident_update(incident, {}, note)
+
+    return {
+        'statusCode': 201,
+        'body': json.dumps({'note': note}, default=str)
+    }
+
+def find_incident(incident_id):
+    """Récupère un incident par son ID (la clé de tri createdAt est inconnue)"""
+    response = table.query(
+        KeyConditionExpression=Key('incidentId').eq(incident_id),
+        Limit=1
+    )
+    items = response.get('Items', [])
+    return items[0] if items else None
+
+def build_note(incident_id, body):
+    """Construit une note, triable par date grâce à son ID"""
+    timestamp = int(datetime.now().timestamp() * 1000)
+
+    return {
+        'incidentId': incident_id,
+        'noteId': f"{timestamp:013d}#{uuid.uuid4()}",
+        'timestamp': timestamp,
+        'author': body.get('author', 'Admin'),
+        'note': body['note']
+    }
+
+def write_incident_update(incident, changes, note=None):
+    """
+    Applique les changements à l'incident sans réécrire l'item complet
+    Avec une note, l'ajout de la note et la mise à jour du compteur et de
+    l'aperçu se font dans une seule transaction
+    """
+    changes = dict(changes, updatedAt=int(datetime.now().timestamp() * 1000))
+    if note:
+        changes['lastNote'] = {
+            'timestamp': note['timestamp'],
+            'author': note['author'],
+            'note': note['note'][:NOTE_PREVIEW_LENGTH]
+        }
+
+    # Seuls les incidents non résolus figurent dans la liste de la page d'accueil
+    resolved = changes.get('status') == 'resolved'
+    if 'status' in changes and not resolved:
+        changes[LISTING_ATTRIBUTE] = OPEN_INCIDENTS_LISTING
+
+    update = {
+        'Key': {
+            'incidentId': incident['incidentId'],
+            'createdAt': incident['createdAt']
+        },
+        'UpdateExpression': 'SET ' + ', '.join(f"#{field} = :{field}" for field in changes),
+        'ConditionExpression': 'attribute_exists(incidentId)',
+        'ExpressionAttributeNames': {f"#{field}": field for field in changes},
+        'ExpressionAttributeValues': {f":{field}": value for field, value in changes.items()}
+    }
+    if resolved:
+        update['UpdateExpression'] += f" REMOVE #{LISTING_ATTRIBUTE}"
+        update['ExpressionAttributeNames'][f"#{LISTING_ATTRIBUTE}"] = LISTING_ATTRIBUTE
+
+    if not note:
+        response = table.update_item(ReturnValues='ALL_NEW', **update)
+        incident = response['Attributes']
+        incident.pop(LISTING_ATTRIBUTE, None)
+        return decompress_fields(incident, COMPRESSED_FIELDS)
+
+    update['UpdateExpression'] += ' ADD noteCount :one'
+    update['ExpressionAttributeValues'][':one'] = 1
+
+    dynamodb.meta.client.transact_write_items(TransactItems=[
+        {
+            'Put': {
+                'TableName': notes_table.name,
+                'Item': compress_fields(note, NOTE_COMPRESSED_FIELDS),
+                'ConditionExpression': 'attribute_not_exists(noteId)'
+            }
+        },
+        {
+            'Update': dict(update, TableName=table.name)
+        }
+    ])
+
+    incident = dict(incident, **changes)
+    incident['noteCount'] = incident.get('noteCount', 0) + 1
+    incident.pop(LISTING_ATTRIBUTE, None)
+    return decompress_fields(incident, COMPRESSED_FIELDS)
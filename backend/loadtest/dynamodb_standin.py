@@ -0,0 +1,825 @@
+"""
+DynamoDB en mémoire pour le banc de charge
+Reproduit ce qu'utilisent les Lambdas : tables et clés, expressions (conditions,
+mises à jour, projections), pagination, transactions, batch writer et flux
+Chaque opération est atomique (verrou global), comme un appel DynamoDB :
+une lecture suivie d'une écriture reste exposée aux mises à jour concurrentes
+"""
+import copy
+import re
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+MAX_ITEM_SIZE = 400 * 1024
+MAX_PAGE_SIZE = 1024 * 1024
+
+class ClientError(Exception):
+    """Même forme que botocore.exceptions.ClientError"""
+
+    def __init__(self, error_response, operation_name):
+        self.response = error_response
+        self.operation_name = operation_name
+        error = error_response.get('Error', {})
+        super().__init__(
+            f"An error occurred ({error.get('Code')}) when calling the "
+            f"{operation_name} operation: {error.get('Message')}"
+        )
+
+def client_error(code, message, operation):
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+class Binary:
+    """Même forme que boto3.dynamodb.types.Binary"""
+
+    def __init__(self, value):
+        self.value = bytes(value)
+
+    def __eq__(self, other):
+        return self.value == getattr(other, 'value', other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __bytes__(self):
+        return self.value
+
+    def __repr__(self):
+        return f"Binary({self.value!r})"
+
+def normalize(value):
+    """Convertit une valeur Python comme le fait boto3 à l'écriture"""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        raise TypeError('Float types are not supported. Use Decimal types instead.')
+    if isinstance(value, (int, Decimal)):
+        return Decimal(value)
+    if isinstance(value, (bytes, bytearray)):
+        return Binary(value)
+    if isinstance(value, Binary):
+        return Binary(value.value)
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {normalize(v) for v in value}
+    raise TypeError(f"Unsupported type {type(value).__name__} for value {value!r}")
+
+def value_size(value):
+    """Taille approximative d'une valeur selon les règles DynamoDB"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, Binary):
+        return len(value.value)
+    if isinstance(value, Decimal):
+        return 1 + (len(value.as_tuple().digits) + 1) // 2
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode('utf-8')) + value_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, set)):
+        return 3 + sum(value_size(v) + 1 for v in value)
+    return 1
+
+def item_size(item):
+    return sum(len(name.encode('utf-8')) + value_size(value) for name, value in item.items())
+
+# ---------------------------------------------------------------------------
+# Expressions
+# ---------------------------------------------------------------------------
+
+MISSING = object()
+
+class Path:
+    def __init__(self, parts):
+        self.parts = parts
+
+    def resolve(self, names):
+        return [names[p] if isinstance(p, str) and p.startswith('#') else p for p in self.parts]
+
+    def get(self, item, names, values):
+        current = item
+        for part in self.resolve(names):
+            if isinstance(part, int):
+                if not isinstance(current, list) or part >= len(current):
+                    return MISSING
+                current = current[part]
+            else:
+                if not isinstance(current, dict) or part not in current:
+                    return MISSING
+                current = current[part]
+        return current
+
+    def set(self, item, names, value):
+        parts = self.resolve(names)
+        current = item
+        for part in parts[:-1]:
+            current = current[part]
+        if isinstance(parts[-1], int) and parts[-1] >= len(current):
+            current.append(value)
+        else:
+            current[parts[-1]] = value
+
+    def remove(self, item, names):
+        parts = self.resolve(names)
+        current = item
+        for part in parts[:-1]:
+            current = current.get(part, {}) if isinstance(current, dict) else current[part]
+        if isinstance(current, dict):
+            current.pop(parts[-1], None)
+        elif isinstance(current, list) and parts[-1] < len(current):
+            current.pop(parts[-1])
+
+class ValueRef:
+    def __init__(self, name=None, literal=MISSING):
+        self.name = name
+        self.literal = literal
+
+    def get(self, item, names, values):
+        if self.literal is not MISSING:
+            return self.literal
+        return values[self.name]
+
+class Size:
+    def __init__(self, path):
+        self.path = path
+
+    def get(self, item, names, values):
+        value = self.path.get(item, names, values)
+        if value is MISSING:
+            return MISSING
+        if isinstance(value, Binary):
+            return Decimal(len(value.value))
+        if isinstance(value, str):
+            return Decimal(len(value.encode('utf-8')))
+        return Decimal(len(value))
+
+class Function:
+    """if_not_exists et list_append dans une mise à jour"""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def get(self, item, names, values):
+        if self.name == 'if_not_exists':
+            current = self.args[0].get(item, names, values)
+            return self.args[1].get(item, names, values) if current is MISSING else current
+        if self.name == 'list_append':
+            return list(self.args[0].get(item, names, values)) + list(self.args[1].get(item, names, values))
+        raise ValueError(f"Unknown function {self.name}")
+
+class Arithmetic:
+    def __init__(self, left, operator, right):
+        self.left, self.operator, self.right = left, operator, right
+
+    def get(self, item, names, values):
+        left = self.left.get(item, names, values)
+        right = self.right.get(item, names, values)
+        return left + right if self.operator == '+' else left - right
+
+COMPARATORS = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+class Condition:
+    """Nœud de condition évaluable sur un item"""
+
+    def __init__(self, kind, *args):
+        self.kind = kind
+        self.args = args
+
+    def __and__(self, other):
+        return Condition('AND', self, other)
+
+    def __or__(self, other):
+        return Condition('OR', self, other)
+
+    def __invert__(self):
+        return Condition('NOT', self)
+
+    def evaluate(self, item, names, values):
+        kind, args = self.kind, self.args
+
+        if kind == 'AND':
+            return all(arg.evaluate(item, names, values) for arg in args)
+        if kind == 'OR':
+            return any(arg.evaluate(item, names, values) for arg in args)
+        if kind == 'NOT':
+            return not args[0].evaluate(item, names, values)
+        if kind == 'attribute_exists':
+            return args[0].get(item, names, values) is not MISSING
+        if kind == 'attribute_not_exists':
+            return args[0].get(item, names, values) is MISSING
+
+        operands = [arg.get(item, names, values) for arg in args]
+        if any(operand is MISSING for operand in operands):
+            return kind == '<>' and operands[0] is MISSING and operands[1] is not MISSING
+        try:
+            if kind in COMPARATORS:
+                return COMPARATORS[kind](*operands)
+            if kind == 'BETWEEN':
+                return operands[1] <= operands[0] <= operands[2]
+            if kind == 'IN':
+                return operands[0] in operands[1:]
+            if kind == 'begins_with':
+                return operands[0].startswith(operands[1])
+            if kind == 'contains':
+                return operands[1] in operands[0]
+        except TypeError:
+            # Types différents : DynamoDB renvoie faux
+            return False
+        raise ValueError(f"Unknown condition {kind}")
+
+TOKEN = re.compile(
+    r"\s*(?:(?P<op><>|<=|>=|=|<|>|\(|\)|,|\[|\]|\.|\+|-)"
+    r"|(?P<value>:[A-Za-z0-9_]+)|(?P<name>#[A-Za-z0-9_]+)"
+    r"|(?P<number>\d+)|(?P<ident>[A-Za-z_][A-Za-z0-9_]*))"
+)
+
+class Parser:
+    """Analyseur des expressions DynamoDB (conditions, mises à jour, projections)"""
+
+    def __init__(self, text):
+        self.tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Invalid expression near: {text[position:]}")
+            position = match.end()
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+        self.position = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def keyword(self, word):
+        kind, text = self.peek()
+        if kind == 'ident' and text.upper() == word:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text):
+        token = self.next()
+        if token[1] != text:
+            raise ValueError(f"Expected {text!r}, got {token[1]!r}")
+
+    def done(self):
+        return self.position >= len(self.tokens)
+
+    # Conditions
+    def condition(self):
+        node = self.conjunction()
+        while self.keyword('OR'):
+            node = Condition('OR', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.keyword('AND'):
+            node = Condition('AND', node, self.negation())
+        return node
+
+    def negation(self):
+        if self.keyword('NOT'):
+            return Condition('NOT', self.negation())
+        return self.predicate()
+
+    def predicate(self):
+        kind, text = self.peek()
+        if text == '(':
+            self.next()
+            node = self.condition()
+            self.expect(')')
+            return node
+
+        if kind == 'ident' and self.peek(1)[1] == '(' and text in (
+                'attribute_exists', 'attribute_not_exists', 'begins_with', 'contains'):
+            self.next()
+            self.expect('(')
+            args = [self.operand()]
+            while self.peek()[1] == ',':
+                self.next()
+                args.append(self.operand())
+            self.expect(')')
+            return Condition(text, *args)
+
+        left = self.operand()
+        if self.keyword('BETWEEN'):
+            low = self.operand()
+            if not self.keyword('AND'):
+                raise ValueError('Expected AND in BETWEEN')
+            return Condition('BETWEEN', left, low, self.operand())
+        if self.keyword('IN'):
+            self.expect('(')
+            args = [left, self.operand()]
+            while self.peek()[1] == ',':
+                self.next()
+                args.append(self.operand())
+            self.expect(')')
+            return Condition('IN', *args)
+
+        operator = self.next()[1]
+        if operator not in COMPARATORS:
+            raise ValueError(f"Unknown comparator {operator!r}")
+        return Condition(operator, left, self.operand())
+
+    def operand(self):
+        kind, text = self.peek()
+        if kind == 'value':
+            self.next()
+            return ValueRef(text)
+        if kind == 'ident' and self.peek(1)[1] == '(':
+            self.next()
+            self.expect('(')
+            args = [self.operand()]
+            while self.peek()[1] == ',':
+                self.next()
+                args.append(self.operand())
+            self.expect(')')
+            return Size(args[0]) if text == 'size' else Function(text, args)
+        return self.path()
+
+    def path(self):
+        kind, text = self.next()
+        if kind not in ('ident', 'name'):
+            raise ValueError(f"Expected attribute name, got {text!r}")
+        parts = [text]
+        while self.peek()[1] in ('.', '['):
+            if self.next()[1] == '.':
+                parts.append(self.next()[1])
+            else:
+                parts.append(int(self.next()[1]))
+                self.expect(']')
+        return Path(parts)
+
+    # Mises à jour
+    def update(self):
+        actions = []
+        while not self.done():
+            clause = self.next()[1].upper()
+            while True:
+                path = self.path()
+                if clause == 'SET':
+                    self.expect('=')
+                    value = self.operand()
+                    if self.peek()[1] in ('+', '-'):
+                        value = Arithmetic(value, self.next()[1], self.operand())
+                    actions.append(('SET', path, value))
+                elif clause == 'REMOVE':
+                    actions.append(('REMOVE', path, None))
+                elif clause in ('ADD', 'DELETE'):
+                    actions.append((clause, path, self.operand()))
+                else:
+                    raise ValueError(f"Unknown update clause {clause}")
+
+                if self.peek()[1] != ',':
+                    break
+                self.next()
+        return actions
+
+    # Projections
+    def projection(self):
+        paths = [self.path()]
+        while self.peek()[1] == ',':
+            self.next()
+            paths.append(self.path())
+        return paths
+
+def parse_condition(expression):
+    if expression is None or isinstance(expression, Condition):
+        return expression
+    return Parser(expression).condition()
+
+def project(item, projection, names):
+    if not projection:
+        return item
+    paths = Parser(projection).projection()
+    projected = {}
+    for path in paths:
+        name = path.resolve(names)[0]
+        if name in item:
+            projected[name] = item[name]
+    return projected
+
+def apply_update(item, expression, names, values):
+    for action, path, operand in Parser(expression).update():
+        if action == 'SET':
+            path.set(item, names, operand.get(item, names, values))
+        elif action == 'REMOVE':
+            path.remove(item, names)
+        elif action == 'ADD':
+            current = path.get(item, names, values)
+            value = operand.get(item, names, values)
+            if current is MISSING:
+                path.set(item, names, value)
+            elif isinstance(current, set):
+                path.set(item, names, current | value)
+            else:
+                path.set(item, names, current + value)
+        elif action == 'DELETE':
+            current = path.get(item, names, values)
+            if current is not MISSING:
+                path.set(item, names, current - operand.get(item, names, values))
+
+# ---------------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------------
+
+class TableData:
+    def __init__(self, name, hash_key, range_key=None, stream=False, indexes=None):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.stream = stream
+        # Index secondaires globaux : nom -> attributs de clé (creux : items sans ces attributs absents)
+        self.indexes = indexes or {}
+        self.items = {}
+        self.ttl = None
+
+    @property
+    def key_names(self):
+        return [self.hash_key] + ([self.range_key] if self.range_key else [])
+
+    def key_of(self, key, operation):
+        if set(key) != set(self.key_names):
+            raise client_error('ValidationException',
+                               'The provided key element does not match the schema', operation)
+        return tuple(normalize(key[name]) for name in self.key_names)
+
+    def sort_key(self, key):
+        return tuple((type(part).__name__, part) for part in key)
+
+    def index_key_names(self, index_name, operation):
+        if index_name not in self.indexes:
+            raise client_error('ValidationException',
+                               f"The table does not have the specified index: {index_name}", operation)
+        return self.indexes[index_name]
+
+class DynamoDBStandIn:
+    """Stockage partagé par toutes les ressources et tous les clients DynamoDB"""
+
+    def __init__(self, latency=0.0, on_change=None):
+        self.lock = threading.RLock()
+        self.tables = {}
+        self.latency = latency
+        self.on_change = on_change
+        self.calls = 0
+
+    def create_table(self, name, hash_key, range_key=None, stream=False, indexes=None):
+        with self.lock:
+            if name not in self.tables:
+                self.tables[name] = TableData(name, hash_key, range_key, stream, indexes)
+            return self.tables[name]
+
+    def table(self, name, operation):
+        table = self.tables.get(name)
+        if table is None:
+            raise client_error('ResourceNotFoundException', f"Requested resource not found: Table: {name} not found", operation)
+        return table
+
+    def call(self):
+        """Latence réseau simulée, hors verrou"""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def write(self, table, key, old, new):
+        """Applique une écriture et publie l'enregistrement de flux"""
+        if new is None:
+            table.items.pop(key, None)
+        else:
+            if item_size(new) > MAX_ITEM_SIZE:
+                raise client_error('ValidationException', 'Item size has exceeded the maximum allowed size', 'PutItem')
+            table.items[key] = new
+
+        if table.stream and self.on_change and old != new:
+            event_name = 'REMOVE' if new is None else ('INSERT' if old is None else 'MODIFY')
+            self.on_change(table, {
+                'eventID': uuid.uuid4().hex,
+                'eventName': event_name,
+                'keys': {name: (new or old)[name] for name in table.key_names},
+                'old': copy.deepcopy(old),
+                'new': copy.deepcopy(new),
+                'time': time.time()
+            })
+
+    def check(self, condition, item, names, values, operation, code='ConditionalCheckFailedException'):
+        if condition is not None and not condition.evaluate(item or {}, names or {}, values or {}):
+            raise client_error(code, 'The conditional request failed', operation)
+
+    # Opérations
+    def put_item(self, table_name, Item, ConditionExpression=None,
+                 ExpressionAttributeNames=None, ExpressionAttributeValues=None, **kwargs):
+        self.call()
+        item = normalize(Item)
+        values = normalize(ExpressionAttributeValues or {})
+        condition = parse_condition(ConditionExpression)
+        with self.lock:
+            table = self.table(table_name, 'PutItem')
+            key = table.key_of({name: item.get(name) for name in table.key_names if name in item}, 'PutItem')
+            old = table.items.get(key)
+            self.check(condition, old, ExpressionAttributeNames, values, 'PutItem')
+            self.write(table, key, old, item)
+        return {}
+
+    def get_item(self, table_name, Key, ProjectionExpression=None, ExpressionAttributeNames=None, **kwargs):
+        self.call()
+        with self.lock:
+            table = self.table(table_name, 'GetItem')
+            item = table.items.get(table.key_of(Key, 'GetItem'))
+            if item is None:
+                return {}
+            return {'Item': copy.deepcopy(project(item, ProjectionExpression, ExpressionAttributeNames or {}))}
+
+    def delete_item(self, table_name, Key, ConditionExpression=None,
+                    ExpressionAttributeNames=None, ExpressionAttributeValues=None, **kwargs):
+        self.call()
+        values = normalize(ExpressionAttributeValues or {})
+        condition = parse_condition(ConditionExpression)
+        with self.lock:
+            table = self.table(table_name, 'DeleteItem')
+            key = table.key_of(Key, 'DeleteItem')
+            old = table.items.get(key)
+            self.check(condition, old, ExpressionAttributeNames, values, 'DeleteItem')
+            if old is not None:
+                self.write(table, key, old, None)
+        return {}
+
+    def update_item(self, table_name, Key, UpdateExpression, ConditionExpression=None,
+                    ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+                    ReturnValues='NONE', **kwargs):
+        self.call()
+        names = ExpressionAttributeNames or {}
+        values = normalize(ExpressionAttributeValues or {})
+        condition = parse_condition(ConditionExpression)
+        with self.lock:
+            table = self.table(table_name, 'UpdateItem')
+            key = table.key_of(Key, 'UpdateItem')
+            old = table.items.get(key)
+            self.check(condition, old, names, values, 'UpdateItem')
+
+            new = copy.deepcopy(old) if old is not None else normalize(dict(Key))
+            apply_update(new, UpdateExpression, names, values)
+            self.write(table, key, old, new)
+
+        if ReturnValues == 'ALL_NEW':
+            return {'Attributes': copy.deepcopy(new)}
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            return {'Attributes': copy.deepcopy(old)}
+        return {}
+
+    def query(self, table_name, KeyConditionExpression, **kwargs):
+        return self.read(table_name, 'Query', parse_condition(KeyConditionExpression), **kwargs)
+
+    def scan(self, table_name, **kwargs):
+        return self.read(table_name, 'Scan', None, **kwargs)
+
+    def read(self, table_name, operation, key_condition, FilterExpression=None,
+             ProjectionExpression=None, ExpressionAttributeNames=None,
+             ExpressionAttributeValues=None, Limit=None, ExclusiveStartKey=None,
+             ScanIndexForward=True, Segment=None, TotalSegments=None, Select=None, IndexName=None, **kwargs):
+        self.call()
+        names = ExpressionAttributeNames or {}
+        values = normalize(ExpressionAttributeValues or {})
+        filter_condition = parse_condition(FilterExpression)
+
+        with self.lock:
+            table = self.table(table_name, operation)
+            if IndexName:
+                index_keys = table.index_key_names(IndexName, operation)
+                keys = sorted(
+                    (key for key, item in table.items.items() if all(name in item for name in index_keys)),
+                    key=lambda key: (table.sort_key(tuple(table.items[key][name] for name in index_keys)),
+                                     table.sort_key(key)),
+                    reverse=not ScanIndexForward
+                )
+            else:
+                index_keys = []
+                keys = sorted(table.items, key=table.sort_key, reverse=not ScanIndexForward)
+
+            if key_condition is not None:
+                keys = [key for key in keys if key_condition.evaluate(table.items[key], names, values)]
+            if Segment is not None:
+                keys = [key for key in keys if hash(key[0]) % TotalSegments == Segment]
+            if ExclusiveStartKey:
+                start = table.key_of({name: ExclusiveStartKey.get(name) for name in table.key_names}, operation)
+                keys = keys[keys.index(start) + 1:] if start in keys else []
+
+            items = []
+            evaluated = 0
+            size = 0
+            last_key = None
+            for key in keys:
+                item = table.items[key]
+                evaluated += 1
+                size += item_size(item)
+                last_key = key
+                if filter_condition is None or filter_condition.evaluate(item, names, values):
+                    items.append(copy.deepcopy(project(item, ProjectionExpression, names)))
+                if (Limit and evaluated >= Limit) or size >= MAX_PAGE_SIZE:
+                    break
+            else:
+                last_key = None
+
+            response = {'Items': items, 'Count': len(items), 'ScannedCount': evaluated}
+            if last_key is not None and keys and last_key != keys[-1]:
+                response['LastEvaluatedKey'] = dict(zip(table.key_names, last_key))
+                response['LastEvaluatedKey'].update({name: table.items[last_key][name] for name in index_keys})
+            if Select == 'COUNT':
+                response.pop('Items')
+            return response
+
+    def transact_write_items(self, TransactItems, **kwargs):
+        self.call()
+        with self.lock:
+            writes = []
+            reasons = []
+            for entry in TransactItems:
+                (action, params), = entry.items()
+                table = self.table(params['TableName'], 'TransactWriteItems')
+                names = params.get('ExpressionAttributeNames') or {}
+                values = normalize(params.get('ExpressionAttributeValues') or {})
+                condition = parse_condition(params.get('ConditionExpression'))
+
+                if action == 'Put':
+                    item = normalize(params['Item'])
+                    key = table.key_of({name: item[name] for name in table.key_names}, 'TransactWriteItems')
+                else:
+                    key = table.key_of(params['Key'], 'TransactWriteItems')
+                old = table.items.get(key)
+
+                if condition is not None and not condition.evaluate(old or {}, names, values):
+                    reasons.append('ConditionalCheckFailed')
+                    continue
+                reasons.append('None')
+
+                if action == 'Put':
+                    writes.append((table, key, old, item))
+                elif action == 'Update':
+                    new = copy.deepcopy(old) if old is not None else normalize(dict(params['Key']))
+                    apply_update(new, params['UpdateExpression'], names, values)
+                    writes.append((table, key, old, new))
+                elif action == 'Delete':
+                    writes.append((table, key, old, None))
+
+            if any(reason != 'None' for reason in reasons):
+                raise client_error(
+                    'TransactionCanceledException',
+                    f"Transaction cancelled, please refer cancellation reasons for specific reasons [{', '.join(reasons)}]",
+                    'TransactWriteItems'
+                )
+
+            for table, key, old, new in writes:
+                self.write(table, key, old, new)
+        return {}
+
+    def batch_write(self, table_name, requests):
+        self.call()
+        with self.lock:
+            table = self.table(table_name, 'BatchWriteItem')
+            for action, payload in requests:
+                if action == 'put':
+                    item = normalize(payload)
+                    key = table.key_of({name: item[name] for name in table.key_names}, 'BatchWriteItem')
+                    self.write(table, key, table.items.get(key), item)
+                else:
+                    key = table.key_of(payload, 'BatchWriteItem')
+                    if key in table.items:
+                        self.write(table, key, table.items[key], None)
+
+    def snapshot(self):
+        """Copie de toutes les tables (vérification après le tir)"""
+        with self.lock:
+            return {name: [copy.deepcopy(item) for item in table.items.values()]
+                    for name, table in self.tables.items()}
+
+# ---------------------------------------------------------------------------
+# Interface boto3 (ressource, table, client)
+# ---------------------------------------------------------------------------
+
+class BatchWriter:
+    def __init__(self, store, table_name, overwrite_by_pkeys=None):
+        self.store = store
+        self.table_name = table_name
+        self.overwrite_by_pkeys = overwrite_by_pkeys
+        self.requests = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def put_item(self, Item):
+        self.add('put', Item)
+
+    def delete_item(self, Key):
+        self.add('delete', Key)
+
+    def add(self, action, payload):
+        if self.overwrite_by_pkeys:
+            key = tuple(payload.get(name) for name in self.overwrite_by_pkeys)
+            self.requests = [r for r in self.requests
+                             if tuple(r[1].get(name) for name in self.overwrite_by_pkeys) != key]
+        self.requests.append((action, payload))
+        if len(self.requests) >= 25:
+            self.flush()
+
+    def flush(self):
+        if self.requests:
+            self.store.batch_write(self.table_name, self.requests)
+            self.requests = []
+
+class Table:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.table_name = name
+
+    @property
+    def key_schema(self):
+        table = self.store.table(self.name, 'DescribeTable')
+        return [{'AttributeName': table.hash_key, 'KeyType': 'HASH'}] + (
+            [{'AttributeName': table.range_key, 'KeyType': 'RANGE'}] if table.range_key else [])
+
+    def load(self):
+        self.store.table(self.name, 'DescribeTable')
+
+    def wait_until_exists(self):
+        self.load()
+
+    def put_item(self, **kwargs):
+        return self.store.put_item(self.name, **kwargs)
+
+    def get_item(self, **kwargs):
+        return self.store.get_item(self.name, **kwargs)
+
+    def delete_item(self, **kwargs):
+        return self.store.delete_item(self.name, **kwargs)
+
+    def update_item(self, **kwargs):
+        return self.store.update_item(self.name, **kwargs)
+
+    def query(self, **kwargs):
+        return self.store.query(self.name, **kwargs)
+
+    def scan(self, **kwargs):
+        return self.store.scan(self.name, **kwargs)
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return BatchWriter(self.store, self.name, overwrite_by_pkeys)
+
+class ResourceClient:
+    """Client accessible via resource.meta.client (types Python natifs)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def transact_write_items(self, **kwargs):
+        return self.store.transact_write_items(**kwargs)
+
+    def describe_time_to_live(self, TableName):
+        table = self.store.table(TableName, 'DescribeTimeToLive')
+        status = 'ENABLED' if table.ttl else 'DISABLED'
+        return {'TimeToLiveDescription': {'TimeToLiveStatus': status, 'AttributeName': table.ttl}}
+
+    def update_time_to_live(self, TableName, TimeToLiveSpecification):
+        table = self.store.table(TableName, 'UpdateTimeToLive')
+        table.ttl = TimeToLiveSpecification['AttributeName'] if TimeToLiveSpecification['Enabled'] else None
+        return {'TimeToLiveSpecification': TimeToLiveSpecification}
+
+class Meta:
+    def __init__(self, client):
+        self.client = client
+
+class Resource:
+    def __init__(self, store):
+        self.store = store
+        self.meta = Meta(ResourceClient(store))
+
+    def Table(self, name):
+        return Table(self.store, name)
+
+    def create_table(self, TableName, KeySchema, GlobalSecondaryIndexes=(), **kwargs):
+        keys = {key['KeyType']: key['AttributeName'] for key in KeySchema}
+        indexes = {index['IndexName']: [key['AttributeName'] for key in index['KeySchema']]
+                   for index in GlobalSecondaryIndexes}
+        self.store.create_table(TableName, keys['HASH'], keys.get('RANGE'), indexes=indexes)
+        return Table(self.store, TableName)
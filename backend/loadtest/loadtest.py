@@ -0,0 +1,488 @@
+"""
+Banc de charge de l'API Delphinium
+Sert les routes de template.yaml derrière une passerelle HTTP locale (services
+AWS en mémoire), rejoue une charge mixte à concurrence fixe ou à débit fixe, puis
+rapporte par route : débit, latences (p50/p95/p99), erreurs, conflits et mises à
+jour perdues (réponses ou notes acceptées mais absentes des tables)
+
+Usage :
+    python loadtest/loadtest.py --scenario incident-email --concurrency 200 --duration 20
+    python loadtest/loadtest.py --scenario admin-contention --concurrency 8 --duration 10
+    python loadtest/loadtest.py --workload ma_charge.json --rate 100 --duration 30 --report rapport.json
+
+Chaque écriture est vérifiée dans la table et l'attribut qui possèdent la donnée
+(STORED_IN) ; dans un fichier --workload, une requête peut l'indiquer avec
+"storedIn": {"table": ..., "field": ..., "key": paramètre de chemin}
+
+Les latences mesurent le code des Lambdas en Python local avec une latence
+simulée par appel AWS (--service-latency-ms) ; elles servent à comparer des
+versions entre elles, pas à prédire les temps de réponse en production
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, LOADTEST_DIR)
+
+import shim
+import standins
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(LOADTEST_DIR), 'template.yaml')
+TOKEN = re.compile(r"lt[0-9a-f]{16}")
+
+# Où chaque écriture doit être conservée : table, attribut et, pour les routes
+# qui ciblent un élément existant, paramètre de chemin désignant la partition.
+# Le fil d'actualité et les aperçus (lastNote) recopient les textes : y chercher
+# les jetons masquerait une réponse ou une note perdue
+STORED_IN = {
+    'POST /newsgroup/threads/{threadId}/replies': {'table': 'delphinium-newsgroup', 'key': 'threadId', 'field': 'replies'},
+    'POST /incidents/{incidentId}/notes': {'table': 'delphinium-incident-notes', 'key': 'incidentId', 'field': 'note'},
+    'PUT /incidents/{incidentId}': {'table': 'delphinium-incident-notes', 'key': 'incidentId', 'field': 'note'},
+    'POST /incidents': {'table': 'delphinium-incidents', 'field': 'title'},
+    'POST /newsgroup/threads': {'table': 'delphinium-newsgroup', 'field': 'title'},
+    'POST /blog/posts': {'table': 'delphinium-blog', 'field': 'title'},
+    'POST /calendar/events': {'table': 'delphinium-calendar', 'field': 'title'},
+    'POST /documents': {'table': 'delphinium-documents', 'field': 'name'},
+    'POST /access-requests': {'table': 'delphinium-access-requests', 'field': 'message'},
+}
+
+# Texte assez long pour être stocké compressé (binaire dans les tables et les flux)
+POST_CONTENT = (
+    "Un échafaudage sera installé le long du bâtiment A à partir du 4 mars. "
+    "Les balcons devront être dégagés la veille et les stores remontés pendant toute la durée du chantier. "
+    "L'accès au parking restera possible, mais la rampe sera fermée deux matinées pour la livraison des matériaux. "
+    "Les ouvriers interviendront du lundi au vendredi, de 8 h à 17 h ; aucun travail bruyant n'est prévu le week-end. "
+    "Pour toute question, le conseil syndical tiendra une permanence dans la salle polyvalente chaque mardi soir. "
+) * 2
+
+# Corps des requêtes de création utilisées pour préparer les données
+SEED_BODIES = {
+    'POST /incidents': {'title': 'Ascenseur bloqué au 3e étage {token}', 'description': "L'ascenseur du bâtiment B est à l'arrêt.", 'priority': 'high'},
+    'POST /newsgroup/threads': {'title': 'Bruit dans la cage d\'escalier {token}', 'content': 'Quelqu\'un a-t-il entendu ce bruit cette nuit ?', 'author': 'Résident'},
+    'POST /blog/posts': {'title': 'Travaux de façade {token}', 'summary': 'Début des travaux le 4 mars.', 'content': POST_CONTENT, 'author': 'Conseil syndical'},
+    'POST /calendar/events': {'title': 'Assemblée générale {token}', 'description': 'Salle polyvalente', 'eventDate': '{future_date}', 'time': '19:30', 'location': 'Salle polyvalente'},
+    'POST /documents': {'documentId': '{uuid}', 'fileName': 'pv-ag.pdf', 'name': 'PV assemblée générale {token}', 'category': 'AG', 's3Key': 'documents/{uuid}/pv-ag.pdf'},
+    'POST /access-requests': {'firstName': 'Camille', 'lastName': 'Lefèvre', 'email': 'camille@example.org', 'userType': 'owner', 'message': 'Nouveau propriétaire {token}'},
+}
+
+SCENARIOS = {
+    # 200 résidents ouvrent le site après un e-mail annonçant un incident
+    'incident-email': {
+        'seed': {'POST /incidents': 5, 'POST /newsgroup/threads': 10, 'POST /blog/posts': 10, 'POST /calendar/events': 10},
+        'requests': [
+            {'route': 'GET /dashboard', 'weight': 30},
+            {'route': 'GET /incidents', 'weight': 25},
+            {'route': 'GET /incidents/{incidentId}/notes', 'weight': 15, 'target': 'hot'},
+            {'route': 'GET /feed', 'weight': 10},
+            {'route': 'GET /newsgroup/threads', 'weight': 10},
+            {'route': 'POST /newsgroup/threads/{threadId}/replies', 'weight': 5, 'target': 'hot',
+             'body': {'content': 'Chez nous aussi, plus d\'ascenseur depuis ce matin {token}', 'author': 'Résident {worker}'}},
+            {'route': 'POST /incidents/{incidentId}/notes', 'weight': 5, 'target': 'hot',
+             'body': {'note': 'Signalé par un résident {token}', 'author': 'Résident {worker}'}},
+        ]
+    },
+    # Plusieurs administrateurs mettent à jour le même incident en même temps
+    'admin-contention': {
+        'seed': {'POST /incidents': 1, 'POST /newsgroup/threads': 1},
+        'requests': [
+            {'route': 'PUT /incidents/{incidentId}', 'weight': 30, 'target': 'hot',
+             'body': {'status': 'in_progress', 'assignedTo': 'Ascenseurs Dupont', 'note': 'Technicien appelé {token}', 'author': 'Admin {worker}'}},
+            {'route': 'POST /incidents/{incidentId}/notes', 'weight': 30, 'target': 'hot',
+             'body': {'note': 'Pièce commandée {token}', 'author': 'Admin {worker}'}},
+            {'route': 'POST /newsgroup/threads/{threadId}/replies', 'weight': 30, 'target': 'hot',
+             'body': {'content': 'Merci pour le suivi {token}', 'author': 'Admin {worker}'}},
+            {'route': 'GET /incidents/{incidentId}/notes', 'weight': 10, 'target': 'hot'},
+        ]
+    },
+    # Toutes les routes de lecture et d'écriture
+    'mixed': {
+        'seed': {'POST /incidents': 10, 'POST /newsgroup/threads': 20, 'POST /blog/posts': 20,
+                 'POST /calendar/events': 20, 'POST /documents': 10, 'POST /access-requests': 5},
+        'requests': [
+            {'route': 'GET /dashboard', 'weight': 15},
+            {'route': 'GET /blog/posts', 'weight': 10},
+            {'route': 'GET /calendar/events', 'weight': 10},
+            {'route': 'GET /incidents', 'weight': 10},
+            {'route': 'GET /newsgroup/threads', 'weight': 10},
+            {'route': 'GET /feed', 'weight': 10},
+            {'route': 'GET /documents', 'weight': 5},
+            {'route': 'GET /documents/{documentId}/download-url', 'weight': 5},
+            {'route': 'GET /incidents/{incidentId}/notes', 'weight': 5},
+            {'route': 'POST /newsgroup/threads/{threadId}/replies', 'weight': 5,
+             'body': {'content': 'Réponse {token}', 'author': 'Résident {worker}'}},
+            {'route': 'POST /incidents/{incidentId}/notes', 'weight': 5,
+             'body': {'note': 'Note {token}', 'author': 'Admin'}},
+            {'route': 'POST /newsgroup/threads', 'weight': 3, 'body': SEED_BODIES['POST /newsgroup/threads']},
+            {'route': 'POST /blog/posts', 'weight': 2, 'body': SEED_BODIES['POST /blog/posts']},
+            {'route': 'POST /access-requests', 'weight': 2, 'body': SEED_BODIES['POST /access-requests']},
+        ]
+    }
+}
+
+# ---------------------------------------------------------------------------
+# Requêtes
+# ---------------------------------------------------------------------------
+
+def fill(value, context):
+    """Remplace les marqueurs {token}, {uuid}, {worker}, {future_date}"""
+    if isinstance(value, dict):
+        return {k: fill(v, context) for k, v in value.items()}
+    if isinstance(value, str):
+        for name, replacement in context.items():
+            value = value.replace(f"{{{name}}}", str(replacement))
+    return value
+
+class Client:
+    """Connexion HTTP persistante, une par worker"""
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port
+        self.connection = None
+
+    def send(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data else {}
+        for attempt in range(2):
+            try:
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                self.connection.request(method, path, body=data, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read().decode('utf-8')
+            except (http.client.HTTPException, OSError):
+                self.connection = None
+                if attempt:
+                    raise
+
+class Workload:
+    def __init__(self, definition, rng):
+        self.seed_counts = definition.get('seed', {})
+        self.requests = definition['requests']
+        self.weights = [request.get('weight', 1) for request in self.requests]
+        self.ids = {}
+        self.rng = rng
+
+    def seed(self, client):
+        """Crée les données de départ par l'API et retient leurs identifiants"""
+        for route, count in self.seed_counts.items():
+            method, path = route.split(' ', 1)
+            for _ in range(count):
+                body = fill(SEED_BODIES.get(route, {}), self.context(0))
+                status, payload = client.send(method, path, body)
+                if status >= 300:
+                    raise RuntimeError(f"Seeding {route} failed ({status}): {payload[:200]}")
+                self.collect_ids(json.loads(payload))
+
+    def collect_ids(self, payload):
+        for value in payload.values():
+            if isinstance(value, dict):
+                for name, identifier in value.items():
+                    if name.endswith('Id') and isinstance(identifier, str):
+                        self.ids.setdefault(name, []).append(identifier)
+
+    def context(self, worker):
+        return {
+            'token': f"lt{uuid.uuid4().hex[:16]}",
+            'uuid': uuid.uuid4(),
+            'worker': worker,
+            'future_date': (date.today() + timedelta(days=self.rng.randint(1, 60))).isoformat()
+        }
+
+    def next_request(self, rng, worker):
+        """Tire une requête selon les poids ; renvoie (définition, méthode, chemin, corps, jeton, paramètres)"""
+        request = rng.choices(self.requests, weights=self.weights)[0]
+        method, path = request['route'].split(' ', 1)
+        context = self.context(worker)
+        params = {}
+
+        for name in re.findall(r"\{(\w+)\}", path):
+            candidates = self.ids.get(name)
+            if not candidates:
+                raise RuntimeError(f"No seeded {name} for {request['route']}")
+            identifier = candidates[0] if request.get('target') == 'hot' else rng.choice(candidates)
+            path = path.replace(f"{{{name}}}", identifier)
+            params[name] = identifier
+
+        if request.get('query'):
+            path = f"{path}?{urlencode(request['query'])}"
+
+        body = fill(request.get('body'), context) if request.get('body') is not None else None
+        token = context['token'] if body is not None and context['token'] in json.dumps(body) else None
+        return request, method, path, body, token, params
+
+# ---------------------------------------------------------------------------
+# Exécution
+# ---------------------------------------------------------------------------
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    def record(self, request, status, latency, body, token, params):
+        conflict = status == 409 or 'ConditionalCheckFailed' in body or 'TransactionCanceled' in body
+        with self.lock:
+            self.samples.append({
+                'route': request['route'], 'status': status, 'latency': latency, 'conflict': conflict,
+                'token': token, 'params': params, 'storedIn': request.get('storedIn') or STORED_IN.get(request['route']),
+                'error': body[:200] if status >= 400 else None
+            })
+
+def execute(client, workload, rng, worker, results, scheduled=None):
+    request, method, path, body, token, params = workload.next_request(rng, worker)
+    started = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        status, payload = client.send(method, path, body)
+    except Exception as e:
+        status, payload = 599, f"{type(e).__name__}: {e}"
+    results.record(request, status, time.perf_counter() - started, payload, token, params)
+
+def run_closed(base_url, workload, concurrency, duration, seed):
+    """Concurrence fixe : chaque worker enchaîne les requêtes sans pause"""
+    results = Results()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        client = Client(base_url)
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline:
+            execute(client, workload, rng, index, results)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def run_open(base_url, workload, rate, concurrency, duration, seed):
+    """
+    Débit fixe : les requêtes partent à intervalles réguliers quelle que soit la
+    durée des précédentes ; la latence compte depuis l'instant prévu (file d'attente comprise)
+    """
+    results = Results()
+    local = threading.local()
+    rng_lock = threading.Lock()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    total = int(rate * duration)
+
+    def task(index, scheduled):
+        if not hasattr(local, 'client'):
+            local.client = Client(base_url)
+            with rng_lock:
+                local.rng = random.Random(rng.random())
+        execute(local.client, workload, local.rng, index % concurrency, results, scheduled)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for index in range(total):
+            scheduled = start + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, index, scheduled)
+    return results
+
+# ---------------------------------------------------------------------------
+# Vérification et rapport
+# ---------------------------------------------------------------------------
+
+def find_lost_updates(aws, results):
+    """
+    Jetons des écritures acceptées (2xx) introuvables là où la donnée doit être
+    conservée (STORED_IN, ou storedIn dans la définition de la requête) :
+    la réponse a été confirmée au client mais la donnée n'a pas été gardée
+    Renvoie les jetons perdus par route et les routes sans emplacement connu
+    """
+    from item_codec import decompress_item
+
+    snapshot = aws.dynamodb.snapshot()
+    stored = {}
+
+    def stored_tokens(table, field, key, identifier):
+        cache_key = (table, field, key, identifier)
+        if cache_key not in stored:
+            tokens = set()
+            for item in snapshot.get(table, []):
+                if key and item.get(key) != identifier:
+                    continue
+                tokens.update(TOKEN.findall(json.dumps(decompress_item(item.get(field)), default=str)))
+            stored[cache_key] = tokens
+        return stored[cache_key]
+
+    lost = {}
+    unchecked = set()
+    for sample in results.samples:
+        if not sample['token'] or not 200 <= sample['status'] < 300:
+            continue
+        location = sample['storedIn']
+        if location is None:
+            unchecked.add(sample['route'])
+            continue
+        key = location.get('key')
+        tokens = stored_tokens(location['table'], location['field'], key, sample['params'].get(key))
+        if sample['token'] not in tokens:
+            lost.setdefault(sample['route'], []).append(sample['token'])
+    return lost, sorted(unchecked)
+
+def check_note_counts(aws, template):
+    """Compteur noteCount des incidents comparé au nombre réel de notes"""
+    tables = {table['logicalId']: table['name'] for table in template.tables()}
+    snapshot = aws.dynamodb.snapshot()
+    notes = {}
+    for note in snapshot.get(tables.get('IncidentNotesTable'), []):
+        notes[note['incidentId']] = notes.get(note['incidentId'], 0) + 1
+
+    mismatches = {}
+    for incident in snapshot.get(tables.get('IncidentsTable'), []):
+        expected = notes.get(incident['incidentId'], 0)
+        if 'noteCount' in incident and int(incident['noteCount']) != expected:
+            mismatches[incident['incidentId']] = {'noteCount': int(incident['noteCount']), 'notes': expected}
+    return mismatches
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+def build_report(results, duration, lost_updates, note_counts, api, aws):
+    lost, unchecked = lost_updates
+    routes = {}
+    for sample in results.samples:
+        routes.setdefault(sample['route'], []).append(sample)
+
+    report = {'routes': {}, 'total': {}}
+    for route, samples in sorted(routes.items()):
+        report['routes'][route] = summarize(samples, duration)
+        report['routes'][route]['lostUpdates'] = len(lost.get(route, []))
+        if lost.get(route):
+            report['routes'][route]['lostSamples'] = lost[route][:5]
+
+    report['total'] = summarize(results.samples, duration)
+    report['total']['lostUpdates'] = sum(len(tokens) for tokens in lost.values())
+    report['uncheckedWrites'] = unchecked
+    report['noteCountMismatches'] = note_counts
+    report['unavailableRoutes'] = api.unavailable()
+    report['streams'] = {
+        'published': aws.streams.published,
+        'delivered': aws.streams.delivered,
+        'failed': aws.streams.failures
+    }
+    report['awsCalls'] = aws.dynamodb.calls
+    return report
+
+def summarize(samples, duration):
+    latencies = sorted(sample['latency'] * 1000 for sample in samples)
+    count = len(samples)
+    errors = [s for s in samples if s['status'] >= 500]
+    conflicts = [s for s in samples if s['conflict']]
+    client_errors = [s for s in samples if 400 <= s['status'] < 500 and not s['conflict']]
+
+    summary = {
+        'requests': count,
+        'throughput': round(count / duration, 1) if duration else 0,
+        'p50': round(percentile(latencies, 0.50), 1),
+        'p95': round(percentile(latencies, 0.95), 1),
+        'p99': round(percentile(latencies, 0.99), 1),
+        'max': round(latencies[-1], 1) if latencies else 0,
+        'errorRate': round(len(errors) / count, 4) if count else 0,
+        'conflictRate': round(len(conflicts) / count, 4) if count else 0,
+        'clientErrorRate': round(len(client_errors) / count, 4) if count else 0
+    }
+    samples_with_errors = errors + conflicts + client_errors
+    if samples_with_errors:
+        summary['errorSample'] = f"{samples_with_errors[0]['status']} {samples_with_errors[0]['error']}"
+    return summary
+
+def print_report(report, scenario, mode):
+    print(f"\nScénario : {scenario} — {mode}")
+    header = f"{'Route':<48}{'req':>7}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'err%':>7}{'conf%':>7}{'4xx%':>7}{'perdues':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['routes'].items()) + [('TOTAL', report['total'])]
+    for route, stats in rows:
+        print(f"{route:<48}{stats['requests']:>7}{stats['throughput']:>8}{stats['p50']:>8}{stats['p95']:>8}"
+              f"{stats['p99']:>8}{stats['max']:>8}{stats['errorRate'] * 100:>7.1f}{stats['conflictRate'] * 100:>7.1f}"
+              f"{stats['clientErrorRate'] * 100:>7.1f}{stats['lostUpdates']:>9}")
+
+    print('\nLatences en ms. err = 5xx, conf = conflits (409, condition DynamoDB), perdues = écritures confirmées absentes des tables')
+    for route, stats in report['routes'].items():
+        if 'errorSample' in stats:
+            print(f"  {route} : {stats['errorSample']}")
+    if report['uncheckedWrites']:
+        print(f"Écritures non vérifiées (emplacement inconnu, voir storedIn) : {', '.join(report['uncheckedWrites'])}")
+    if report['noteCountMismatches']:
+        print(f"Compteurs noteCount incohérents : {report['noteCountMismatches']}")
+    if report['unavailableRoutes']:
+        print('Routes indisponibles (échec du chargement de la Lambda) :')
+        for route, error in report['unavailableRoutes'].items():
+            print(f"  {route} : {error}")
+    print(f"Flux : {report['streams']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de charge de l'API Delphinium")
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE)
+    parser.add_argument('--scenario', choices=list(SCENARIOS), default='incident-email')
+    parser.add_argument('--workload', help='Fichier JSON de charge (seed, requests) à la place du scénario')
+    parser.add_argument('--concurrency', type=int, default=50, help='Workers simultanés')
+    parser.add_argument('--rate', type=float, help='Débit fixe en requêtes/s (sinon concurrence fixe)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Durée du tir en secondes')
+    parser.add_argument('--service-latency-ms', type=float, default=2.0, help='Latence simulée par appel AWS')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--report', help='Écrire le rapport JSON dans ce fichier')
+    args = parser.parse_args()
+
+    if args.workload:
+        with open(args.workload, encoding='utf-8') as workload_file:
+            definition = json.load(workload_file)
+        scenario = os.path.basename(args.workload)
+    else:
+        definition = SCENARIOS[args.scenario]
+        scenario = args.scenario
+
+    aws = standins.AWSStandIns(latency=args.service_latency_ms / 1000)
+    aws.install()
+    template = shim.Template(args.template)
+    api = shim.LocalApi(template, aws).load()
+    aws.streams.start()
+    server, base_url = shim.serve(api)
+
+    workload = Workload(definition, random.Random(args.seed))
+    workload.seed(Client(base_url))
+    aws.streams.drain()
+
+    if args.rate:
+        mode = f"débit fixe {args.rate} req/s, {args.concurrency} workers max, {args.duration}s"
+        results = run_open(base_url, workload, args.rate, args.concurrency, args.duration, args.seed)
+    else:
+        mode = f"concurrence fixe {args.concurrency}, {args.duration}s"
+        results = run_closed(base_url, workload, args.concurrency, args.duration, args.seed)
+
+    aws.streams.drain()
+    aws.streams.stop()
+    server.shutdown()
+
+    report = build_report(results, args.duration, find_lost_updates(aws, results),
+                          check_note_counts(aws, template), api, aws)
+    print_report(report, scenario, mode)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Passerelle HTTP locale pour les routes déclarées dans template.yaml
+Lit les fonctions, routes, tables et flux du template SAM, charge chaque Lambda
+et traduit les requêtes HTTP en événements API Gateway (intégration proxy)
+"""
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import yaml
+
+ACCOUNT_ID = '000000000000'
+REGION = 'local'
+
+# ---------------------------------------------------------------------------
+# Lecture du template SAM
+# ---------------------------------------------------------------------------
+
+class TemplateLoader(yaml.SafeLoader):
+    """Chargeur YAML qui conserve les fonctions intrinsèques (!Ref, !Sub, !GetAtt)"""
+
+def intrinsic(tag):
+    def construct(loader, node):
+        if isinstance(node, yaml.ScalarNode):
+            value = loader.construct_scalar(node)
+        else:
+            value = loader.construct_sequence(node, deep=True)
+        return {tag: value}
+    return construct
+
+for tag in ('Ref', 'Sub', 'GetAtt', 'Join', 'Select', 'Split', 'If', 'Equals', 'ImportValue'):
+    TemplateLoader.add_constructor(f"!{tag}", intrinsic(f"Fn::{tag}" if tag != 'Ref' else 'Ref'))
+
+class Template:
+    def __init__(self, path, parameters=None):
+        with open(path, encoding='utf-8') as template_file:
+            self.document = yaml.load(template_file, Loader=TemplateLoader)
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.resources = self.document.get('Resources', {})
+        self.parameters = {
+            name: (parameters or {}).get(name, spec.get('Default', f"local-{name}"))
+            for name, spec in self.document.get('Parameters', {}).items()
+        }
+
+    def resolve(self, value):
+        """Résout les références vers des valeurs locales"""
+        if isinstance(value, dict) and len(value) == 1:
+            (function, argument), = value.items()
+            if function == 'Ref':
+                return self.ref(argument)
+            if function == 'Fn::Sub':
+                text = argument if isinstance(argument, str) else argument[0]
+                return re.sub(r"\$\{([^}]+)\}", lambda m: str(self.ref(m.group(1))), text)
+            if function == 'Fn::GetAtt':
+                name, attribute = argument.split('.', 1) if isinstance(argument, str) else argument
+                return f"{self.ref(name)}.{attribute}"
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(v) for v in value]
+        return value
+
+    def ref(self, name):
+        pseudo = {'AWS::AccountId': ACCOUNT_ID, 'AWS::Region': REGION, 'AWS::StackName': 'delphinium-local'}
+        if name in pseudo:
+            return pseudo[name]
+        if name in self.parameters:
+            return self.parameters[name]
+        resource = self.resources.get(name)
+        if resource is None:
+            return name
+        properties = resource.get('Properties', {})
+        for attribute in ('TableName', 'BucketName', 'LayerName'):
+            if attribute in properties:
+                return self.resolve(properties[attribute])
+        return name
+
+    def tables(self):
+        """Tables DynamoDB : nom, clés, index secondaires globaux, flux activé"""
+        for logical_id, resource in self.resources.items():
+            if resource.get('Type') != 'AWS::DynamoDB::Table':
+                continue
+            properties = resource['Properties']
+            keys = {key['KeyType']: key['AttributeName'] for key in properties['KeySchema']}
+            yield {
+                'logicalId': logical_id,
+                'name': self.resolve(properties['TableName']),
+                'hashKey': keys['HASH'],
+                'rangeKey': keys.get('RANGE'),
+                'indexes': {
+                    index['IndexName']: [key['AttributeName'] for key in index['KeySchema']]
+                    for index in properties.get('GlobalSecondaryIndexes', [])
+                },
+                'stream': 'StreamSpecification' in properties
+            }
+
+    def functions(self):
+        """Fonctions Lambda : fichier, handler, variables d'environnement, événements"""
+        globals_function = self.document.get('Globals', {}).get('Function', {})
+        global_variables = globals_function.get('Environment', {}).get('Variables', {})
+
+        for logical_id, resource in self.resources.items():
+            if resource.get('Type') != 'AWS::Serverless::Function':
+                continue
+            properties = resource['Properties']
+            module_path, handler_name = properties['Handler'].rsplit('.', 1)
+            variables = dict(global_variables)
+            variables.update(properties.get('Environment', {}).get('Variables', {}))
+
+            yield {
+                'logicalId': logical_id,
+                'file': os.path.normpath(os.path.join(self.directory, properties.get('CodeUri', './'), f"{module_path}.py")),
+                'handler': handler_name,
+                'environment': {name: str(self.resolve(value)) for name, value in variables.items()},
+                'events': {name: (event['Type'], self.resolve(event.get('Properties', {})))
+                           for name, event in properties.get('Events', {}).items()}
+            }
+
+    def layer_directories(self):
+        """Dossiers des layers (ajoutés au chemin d'import, comme /opt/python)"""
+        for resource in self.resources.values():
+            if resource.get('Type') == 'AWS::Serverless::LayerVersion':
+                yield os.path.join(self.directory, resource['Properties']['ContentUri'])
+
+# ---------------------------------------------------------------------------
+# Chargement des Lambdas et routes
+# ---------------------------------------------------------------------------
+
+class Route:
+    def __init__(self, method, path, function):
+        self.method = method.upper()
+        self.path = path
+        self.function = function
+        pattern = re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(path))
+        self.pattern = re.compile(f"^{pattern}$")
+        # Les routes les plus spécifiques (moins de paramètres) sont testées en premier
+        self.specificity = (path.count('{'), -len(path))
+
+    @property
+    def name(self):
+        return f"{self.method} {self.path}"
+
+class LambdaFunction:
+    def __init__(self, spec):
+        self.logical_id = spec['logicalId']
+        self.file = spec['file']
+        self.handler_name = spec['handler']
+        self.handler = None
+        self.error = None
+
+    def load(self):
+        """Charge le module du handler (None en cas d'erreur d'import)"""
+        try:
+            module_name = f"lambda_{self.logical_id}"
+            spec = importlib.util.spec_from_file_location(module_name, self.file)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            self.handler = getattr(module, self.handler_name)
+        except BaseException as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    def invoke(self, event):
+        return self.handler(event, LambdaContext(self.logical_id))
+
+class LambdaContext:
+    def __init__(self, function_name, timeout=30):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self.deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self):
+        return int(max(self.deadline - time.monotonic(), 0) * 1000)
+
+class LocalApi:
+    """Routes, Lambdas et abonnements aux flux construits depuis le template"""
+
+    def __init__(self, template, standins):
+        self.template = template
+        self.standins = standins
+        self.functions = {}
+        self.routes = []
+        self.schedules = []
+
+    def load(self):
+        for directory in self.template.layer_directories():
+            sys.path.insert(0, directory)
+
+        for table in self.template.tables():
+            self.standins.dynamodb.create_table(table['name'], table['hashKey'], table['rangeKey'],
+                                                table['stream'], table['indexes'])
+
+        specs = list(self.template.functions())
+        # Variables d'environnement lues à l'import des modules
+        for spec in specs:
+            os.environ.update(spec['environment'])
+
+        for spec in specs:
+            function = LambdaFunction(spec)
+            function.load()
+            self.functions[function.logical_id] = function
+
+            for name, (event_type, properties) in spec['events'].items():
+                if event_type == 'Api':
+                    self.routes.append(Route(properties['Method'], properties['Path'], function))
+                elif event_type == 'DynamoDB' and function.handler:
+                    table_name = properties['Stream'].split('.', 1)[0]
+                    self.standins.streams.subscribe(
+                        table_name, function.handler,
+                        batch_size=properties.get('BatchSize'),
+                        retries=min(properties.get('MaximumRetryAttempts', 2), 2)
+                    )
+                elif event_type == 'Schedule':
+                    self.schedules.append(f"{function.logical_id} ({properties.get('Schedule')})")
+
+        self.routes.sort(key=lambda route: route.specificity)
+        return self
+
+    def match(self, method, path):
+        for route in self.routes:
+            if route.method != method.upper():
+                continue
+            match = route.pattern.match(path)
+            if match:
+                return route, match.groupdict()
+        return None, None
+
+    def unavailable(self):
+        return {route.name: route.function.error for route in self.routes if route.function.error}
+
+    def dispatch(self, method, raw_path, headers, body):
+        """Exécute la requête comme API Gateway : renvoie (route, statut, corps)"""
+        url = urlsplit(raw_path)
+        route, path_parameters = self.match(method, url.path)
+
+        if route is None:
+            return None, 403, json.dumps({'message': 'Missing Authentication Token'})
+        if route.function.error:
+            return route, 502, json.dumps({'message': 'Internal server error', 'error': route.function.error})
+
+        query = dict(parse_qsl(url.query))
+        event = {
+            'resource': route.path,
+            'path': url.path,
+            'httpMethod': route.method,
+            'headers': headers,
+            'pathParameters': path_parameters or None,
+            'queryStringParameters': query or None,
+            'body': body,
+            'isBase64Encoded': False,
+            'requestContext': {'stage': 'prod', 'requestId': str(uuid.uuid4())}
+        }
+
+        try:
+            response = route.function.invoke(event)
+        except Exception:
+            traceback.print_exc()
+            return route, 502, json.dumps({'message': 'Internal server error'})
+
+        if not isinstance(response, dict) or not isinstance(response.get('body', ''), str):
+            # Réponse proxy invalide : API Gateway renvoie 502
+            return route, 502, json.dumps({'message': 'Malformed Lambda proxy response'})
+
+        return route, int(response.get('statusCode', 200)), response.get('body') or ''
+
+# ---------------------------------------------------------------------------
+# Serveur HTTP
+# ---------------------------------------------------------------------------
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, chaque réponse
+    # attend l'accusé de réception retardé du client (~40 ms)
+    disable_nagle_algorithm = True
+    api = None
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else None
+        route, status, payload = self.api.dispatch(self.command, self.path, dict(self.headers), body)
+
+        data = payload.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if route is not None:
+            self.send_header('X-Route', route.name)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+    def log_message(self, format, *args):
+        pass
+
+class LocalServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+def serve(api, host='127.0.0.1', port=0):
+    """Démarre le serveur dans un thread et renvoie (serveur, url)"""
+    handler = type('Handler', (RequestHandler,), {'api': api})
+    server = LocalServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
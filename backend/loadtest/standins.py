@@ -0,0 +1,380 @@
+"""
+Services AWS en mémoire pour le banc de charge (DynamoDB, S3, SNS, Cognito)
+install() enregistre des modules boto3/botocore de remplacement avant le
+chargement des Lambdas, qui s'exécutent alors sans compte AWS
+"""
+import base64
+import io
+import sys
+import threading
+import time
+import types
+from decimal import Decimal
+
+import dynamodb_standin
+from dynamodb_standin import Binary, ClientError, Condition, Path, ValueRef, client_error, normalize
+
+# ---------------------------------------------------------------------------
+# boto3.dynamodb.conditions et boto3.dynamodb.types
+# ---------------------------------------------------------------------------
+
+class AttributeBase:
+    def __init__(self, name):
+        self.path = Path(name.split('.'))
+
+    def condition(self, kind, *values):
+        return Condition(kind, self.path, *[ValueRef(literal=normalize(value)) for value in values])
+
+    def eq(self, value):
+        return self.condition('=', value)
+
+    def lt(self, value):
+        return self.condition('<', value)
+
+    def lte(self, value):
+        return self.condition('<=', value)
+
+    def gt(self, value):
+        return self.condition('>', value)
+
+    def gte(self, value):
+        return self.condition('>=', value)
+
+    def begins_with(self, value):
+        return self.condition('begins_with', value)
+
+    def between(self, low, high):
+        return self.condition('BETWEEN', low, high)
+
+class Key(AttributeBase):
+    pass
+
+class Attr(AttributeBase):
+    def ne(self, value):
+        return self.condition('<>', value)
+
+    def is_in(self, values):
+        return self.condition('IN', *values)
+
+    def contains(self, value):
+        return self.condition('contains', value)
+
+    def exists(self):
+        return Condition('attribute_exists', self.path)
+
+    def not_exists(self):
+        return Condition('attribute_not_exists', self.path)
+
+class TypeSerializer:
+    def serialize(self, value):
+        value = normalize(value)
+        if value is None:
+            return {'NULL': True}
+        if isinstance(value, bool):
+            return {'BOOL': value}
+        if isinstance(value, str):
+            return {'S': value}
+        if isinstance(value, Decimal):
+            return {'N': str(value)}
+        if isinstance(value, Binary):
+            return {'B': value.value}
+        if isinstance(value, dict):
+            return {'M': {k: self.serialize(v) for k, v in value.items()}}
+        if isinstance(value, list):
+            return {'L': [self.serialize(v) for v in value]}
+        if isinstance(value, set):
+            sample = next(iter(value))
+            if isinstance(sample, str):
+                return {'SS': sorted(value)}
+            if isinstance(sample, Decimal):
+                return {'NS': [str(v) for v in value]}
+            return {'BS': [v.value for v in value]}
+        raise TypeError(f"Unsupported type {type(value).__name__}")
+
+class TypeDeserializer:
+    def deserialize(self, value):
+        (kind, data), = value.items()
+        if kind == 'NULL':
+            return None
+        if kind in ('S', 'BOOL'):
+            return data
+        if kind == 'N':
+            return Decimal(data)
+        if kind == 'B':
+            return Binary(data)
+        if kind == 'M':
+            return {k: self.deserialize(v) for k, v in data.items()}
+        if kind == 'L':
+            return [self.deserialize(v) for v in data]
+        if kind == 'SS':
+            return set(data)
+        if kind == 'NS':
+            return {Decimal(v) for v in data}
+        if kind == 'BS':
+            return {Binary(v) for v in data}
+        raise TypeError(f"Unknown DynamoDB type {kind}")
+
+# ---------------------------------------------------------------------------
+# S3, SNS, Cognito
+# ---------------------------------------------------------------------------
+
+class S3StandIn:
+    def __init__(self, latency=0.0):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.latency = latency
+
+    def call(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def put_object(self, Bucket, Key, Body=b'', **kwargs):
+        self.call()
+        if isinstance(Body, str):
+            Body = Body.encode('utf-8')
+        elif hasattr(Body, 'read'):
+            Body = Body.read()
+        with self.lock:
+            self.buckets.setdefault(Bucket, {})[Key] = bytes(Body)
+        return {'ETag': f'"{hash(Body) & 0xffffffff:08x}"'}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.call()
+        with self.lock:
+            data = self.buckets.get(Bucket, {}).get(Key)
+        if data is None:
+            raise client_error('NoSuchKey', 'The specified key does not exist.', 'GetObject')
+        return {'Body': io.BytesIO(data), 'ContentLength': len(data)}
+
+    def list_objects_v2(self, Bucket, Prefix='', **kwargs):
+        self.call()
+        with self.lock:
+            keys = sorted(key for key in self.buckets.get(Bucket, {}) if key.startswith(Prefix))
+            return {'Contents': [{'Key': key, 'Size': len(self.buckets[Bucket][key])} for key in keys]}
+
+    def get_paginator(self, operation):
+        standin = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                yield getattr(standin, operation)(**kwargs)
+
+        return Paginator()
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600, **kwargs):
+        params = Params or {}
+        return (f"http://localhost/s3/{params.get('Bucket')}/{params.get('Key')}"
+                f"?X-Amz-Method={ClientMethod}&X-Amz-Expires={ExpiresIn}")
+
+class SNSStandIn:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, **kwargs):
+        self.messages.append(kwargs)
+        return {'MessageId': str(len(self.messages))}
+
+class CognitoStandIn:
+    class exceptions:
+        class NotAuthorizedException(Exception):
+            pass
+
+        class UserNotFoundException(Exception):
+            pass
+
+    def initiate_auth(self, **kwargs):
+        return {'AuthenticationResult': {
+            'AccessToken': 'local-access-token',
+            'IdToken': 'local-id-token',
+            'RefreshToken': 'local-refresh-token',
+            'ExpiresIn': 3600,
+            'TokenType': 'Bearer'
+        }}
+
+    def admin_get_user(self, Username, **kwargs):
+        return {'Username': Username, 'UserAttributes': [{'Name': 'email', 'Value': f"{Username}@example.org"}]}
+
+    def admin_list_groups_for_user(self, Username, **kwargs):
+        return {'Groups': [{'GroupName': 'user'}]}
+
+# ---------------------------------------------------------------------------
+# Flux DynamoDB
+# ---------------------------------------------------------------------------
+
+def stream_value(value):
+    """Valeur telle que dans l'événement JSON de Lambda : binaires (B, BS) en base64"""
+    (kind, data), = value.items()
+    if kind == 'B':
+        return {'B': base64.b64encode(data).decode('ascii')}
+    if kind == 'BS':
+        return {'BS': [base64.b64encode(v).decode('ascii') for v in data]}
+    if kind == 'M':
+        return {'M': {k: stream_value(v) for k, v in data.items()}}
+    if kind == 'L':
+        return {'L': [stream_value(v) for v in data]}
+    return value
+
+class StreamPump:
+    """
+    Accumule les enregistrements de flux et les livre par lots aux Lambdas
+    abonnées (comme le mapping de source d'événements DynamoDB)
+    """
+
+    def __init__(self, batch_size=100, window=0.5):
+        self.lock = threading.Condition()
+        self.pending = {}
+        self.consumers = {}
+        self.batch_size = batch_size
+        self.window = window
+        self.published = 0
+        self.delivered = 0
+        self.failures = 0
+        self.stopped = False
+        self.serializer = TypeSerializer()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def subscribe(self, table_name, handler, batch_size=None, retries=2):
+        self.consumers.setdefault(table_name, []).append((handler, batch_size or self.batch_size, retries))
+
+    def publish(self, table, change):
+        if table.name not in self.consumers:
+            return
+        image = lambda item: {k: stream_value(self.serializer.serialize(v)) for k, v in item.items()} if item else None
+        record = {
+            'eventID': change['eventID'],
+            'eventName': change['eventName'],
+            'eventSource': 'aws:dynamodb',
+            'eventSourceARN': f"arn:aws:dynamodb:local:000000000000:table/{table.name}/stream/local",
+            'dynamodb': {
+                'ApproximateCreationDateTime': change['time'],
+                'Keys': image(change['keys']),
+                'StreamViewType': 'NEW_AND_OLD_IMAGES'
+            }
+        }
+        if change['new'] is not None:
+            record['dynamodb']['NewImage'] = image(change['new'])
+        if change['old'] is not None:
+            record['dynamodb']['OldImage'] = image(change['old'])
+
+        with self.lock:
+            self.pending.setdefault(table.name, []).append(record)
+            self.published += len(self.consumers[table.name])
+            self.lock.notify()
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not any(self.pending.values()) and not self.stopped:
+                    self.lock.wait(timeout=self.window)
+                if self.stopped and not any(self.pending.values()):
+                    return
+
+            # Fenêtre de regroupement avant de livrer le lot
+            time.sleep(self.window)
+            with self.lock:
+                batches = self.pending
+                self.pending = {}
+
+            for table_name, records in batches.items():
+                for handler, batch_size, retries in self.consumers.get(table_name, []):
+                    for start in range(0, len(records), batch_size):
+                        self.deliver(handler, records[start:start + batch_size], retries)
+
+    def deliver(self, handler, records, retries):
+        # Même lot rejoué à l'identique en cas d'erreur (déduplication côté consommateur)
+        for attempt in range(retries + 1):
+            try:
+                handler({'Records': records}, None)
+                self.delivered += len(records)
+                return
+            except Exception as e:
+                print(f"Stream consumer error (attempt {attempt + 1}): {e}")
+        self.failures += len(records)
+
+    def drain(self, timeout=10.0):
+        """Attend la livraison de tous les enregistrements en attente"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.delivered + self.failures >= self.published:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.lock.notify()
+        if self.thread.is_alive():
+            self.thread.join(timeout=5)
+
+# ---------------------------------------------------------------------------
+# Installation des modules de remplacement
+# ---------------------------------------------------------------------------
+
+class AWSStandIns:
+    def __init__(self, latency=0.0):
+        self.streams = StreamPump()
+        self.dynamodb = dynamodb_standin.DynamoDBStandIn(latency, on_change=self.streams.publish)
+        self.s3 = S3StandIn(latency)
+        self.sns = SNSStandIn()
+        self.cognito = CognitoStandIn()
+
+    def resource(self, service_name, **kwargs):
+        if service_name != 'dynamodb':
+            raise ValueError(f"No stand-in resource for {service_name}")
+        return dynamodb_standin.Resource(self.dynamodb)
+
+    def client(self, service_name, **kwargs):
+        clients = {
+            's3': self.s3,
+            'sns': self.sns,
+            'cognito-idp': self.cognito
+        }
+        if service_name not in clients:
+            raise ValueError(f"No stand-in client for {service_name}")
+        return clients[service_name]
+
+    def install(self):
+        """Remplace boto3 et botocore dans sys.modules"""
+        standins = self
+
+        class Session:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def resource(self, service_name, **kwargs):
+                return standins.resource(service_name, **kwargs)
+
+            def client(self, service_name, **kwargs):
+                return standins.client(service_name, **kwargs)
+
+        boto3 = types.ModuleType('boto3')
+        boto3.resource = self.resource
+        boto3.client = self.client
+        boto3.session = types.ModuleType('boto3.session')
+        boto3.session.Session = Session
+        boto3.dynamodb = types.ModuleType('boto3.dynamodb')
+        boto3.dynamodb.conditions = types.ModuleType('boto3.dynamodb.conditions')
+        boto3.dynamodb.conditions.Key = Key
+        boto3.dynamodb.conditions.Attr = Attr
+        boto3.dynamodb.types = types.ModuleType('boto3.dynamodb.types')
+        boto3.dynamodb.types.TypeSerializer = TypeSerializer
+        boto3.dynamodb.types.TypeDeserializer = TypeDeserializer
+        boto3.dynamodb.types.Binary = Binary
+
+        botocore = types.ModuleType('botocore')
+        botocore.exceptions = types.ModuleType('botocore.exceptions')
+        botocore.exceptions.ClientError = ClientError
+
+        sys.modules.update({
+            'boto3': boto3,
+            'boto3.session': boto3.session,
+            'boto3.dynamodb': boto3.dynamodb,
+            'boto3.dynamodb.conditions': boto3.dynamodb.conditions,
+            'boto3.dynamodb.types': boto3.dynamodb.types,
+            'botocore': botocore,
+            'botocore.exceptions': botocore.exceptions
+        })
@@ -5,11 +5,17 @@ import boto3
 import json
 import os
 import uuid
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 from datetime import datetime
 
+from item_codec import TEXT_FIELDS, compress_fields
+
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table(os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'))
 
+COMPRESSED_FIELDS = TEXT_FIELDS['replies']
+
 def lambda_handler(event, context):
     """
     Ajoute une réponse à un thread existant
@@ -27,17 +33,15 @@ def lambda_handler(event, context):
         body = json.loads(event.get('body', '{}'))
         author = body.get('author', 'Anonymous')
 
-        # Récupérer le thread existant
-        response = table.get_item(Key={'threadId': thread_id})
+        # Récupérer le thread existant (la clé de tri timestamp est inconnue)
+        thread = find_thread(thread_id)
 
-        if 'Item' not in response:
+        if thread is None:
             return {
                 'statusCode': 404,
                 'body': json.dumps({'error': 'Thread not found'})
             }
 
-        thread = response['Item']
-
         # Créer la réponse
         reply = {
             'replyId': str(uuid.uuid4()),
@@ -46,13 +50,26 @@ def lambda_handler(event, context):
             'timestamp': int(datetime.now().timestamp() * 1000)
         }
 
-        # Ajouter la réponse au thread
-        if 'replies' not in thread:
-            thread['replies'] = []
-        thread['replies'].append(reply)
-
-        # Mettre à jour le thread
-        table.put_item(Item=thread)
+        # Ajouter la réponse à la liste sans réécrire le thread :
+        # les réponses envoyées en même temps sont toutes conservées
+        try:
+            table.update_item(
+                Key={'threadId': thread['threadId'], 'timestamp': thread['timestamp']},
+                UpdateExpression='SET replies = list_append(if_not_exists(replies, :empty), :reply)',
+                ConditionExpression='attribute_exists(threadId) AND attribute_not_exists(archivedAt)',
+                ExpressionAttributeValues={
+                    ':empty': [],
+                    ':reply': [compress_fields(reply, COMPRESSED_FIELDS)]
+                }
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # Thread supprimé ou archivé entre la lecture et l'écriture
+            return {
+                'statusCode': 409,
+                'body': json.dumps({'error': 'Thread is archived'})
+            }
 
         return {
             'statusCode': 201,
@@ -65,3 +82,12 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
+
+def find_thread(thread_id):
+    """Récupère un thread par son ID"""
+    response = table.query(
+        KeyConditionExpression=Key('threadId').eq(thread_id),
+        Limit=1
+    )
+    items = response.get('Items', [])
+    return items[0] if items else None
@@ -0,0 +1,119 @@
+"""
+Lambda function pour gérer les threads du newsgroup (forum de discussion)
+"""
+import boto3
+import json
+import os
+import uuid
+from boto3.dynamodb.conditions import Attr
+from datetime import datetime
+from decimal import Decimal
+
+from archive_store import archive_period, read_archive
+from item_codec import TEXT_FIELDS, compress_fields, decompress_fields
+from listing import LISTING_ATTRIBUTE, THREADS_LISTING, query_listing
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table(os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'))
+
+COMPRESSED_FIELDS = TEXT_FIELDS['threads']
+REPLY_COMPRESSED_FIELDS = TEXT_FIELDS['replies']
+
+def lambda_handler(event, context):
+    """
+    Gère les opérations CRUD sur les threads du newsgroup
+    GET: Récupérer tous les threads
+    POST: Créer un nouveau thread
+    """
+    http_method = event.get('httpMethod')
+
+    try:
+        if http_method == 'GET':
+            return get_threads(event)
+        elif http_method == 'POST':
+            return create_thread(event)
+        else:
+            return {
+                'statusCode': 405,
+                'body': json.dumps({'message': 'Method not allowed'})
+            }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def get_threads(event):
+    """
+    Récupère tous les threads du forum
+    Avec archive=true, lit les threads archivés (paramètres year, month, cursor)
+    """
+    query_params = event.get('queryStringParameters') or {}
+    if query_params.get('archive') == 'true':
+        return get_archived_threads(query_params)
+
+    response = table.scan(FilterExpression=Attr('archivedAt').not_exists())
+    threads = response.get('Items', [])
+
+    for thread in threads:
+        thread.pop(LISTING_ATTRIBUTE, None)
+        decompress_fields(thread, COMPRESSED_FIELDS)
+        for reply in thread.get('replies', []):
+            decompress_fields(reply, REPLY_COMPRESSED_FIELDS)
+
+    # Trier par timestamp décroissant
+    threads.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'threads': threads}, default=str)
+    }
+
+def get_archived_threads(query_params):
+    """Récupère les threads archivés d'une année (ou d'un mois) depuis S3 (page suivante via cursor)"""
+    try:
+        period = archive_period(query_params)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': str(e)})
+        }
+
+    threads, next_cursor = read_archive('threads', **period)
+    threads.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'threads': threads, 'archive': True, 'truncated': next_cursor is not None, 'nextCursor': next_cursor}, default=str)
+    }
+
+def list_recent_threads(limit):
+    """Récupère les derniers threads, sans contenu ni réponses (page d'accueil)"""
+    return query_listing(table, THREADS_LISTING, 'timestamp', limit, ['threadId', 'title', 'author', 'timestamp'])
+
+def create_thread(event):
+    """Crée un nouveau thread de discussion"""
+    body = json.loads(event.get('body', '{}'))
+
+    # Récupérer l'auteur depuis le token JWT (simplifié ici)
+    author = body.get('author', 'Anonymous')
+
+    thread_id = str(uuid.uuid4())
+    timestamp = int(datetime.now().timestamp() * 1000)
+
+    thread = {
+        'threadId': thread_id,
+        'title': body.get('title'),
+        'content': body.get('content'),
+        'author': author,
+        'timestamp': timestamp,
+        'replies': []
+    }
+
+    table.put_item(Item={**compress_fields(thread, COMPRESSED_FIELDS), LISTING_ATTRIBUTE: THREADS_LISTING})
+
+    return {
+        'statusCode': 201,
+        'body': json.dumps({'thread': thread}, default=str)
+    }
+
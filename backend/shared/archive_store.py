@@ -0,0 +1,124 @@
+"""
+Stockage des données archivées sur S3
+Fichiers JSONL compressés (gzip), partitionnés par type, année et mois :
+archive/<type>/year=<AAAA>/month=<MM>/<nom>.jsonl.gz
+Partagé (layer Lambda) entre la Lambda d'archivage et les listes en mode archive
+"""
+import base64
+import boto3
+import gzip
+import io
+import json
+import os
+from decimal import Decimal
+
+s3_client = boto3.client('s3')
+archive_bucket = os.environ.get('ARCHIVE_BUCKET', 'delphinium-archives')
+
+# Nombre maximal d'items renvoyés par une lecture d'archive
+MAX_ITEMS = int(os.environ.get('ARCHIVE_MAX_ITEMS', '1000'))
+
+def partition_prefix(kind, year, month):
+    """Préfixe S3 d'une partition mensuelle"""
+    return f"archive/{kind}/year={int(year):04d}/month={int(month):02d}/"
+
+def write_partition(kind, year, month, name, items):
+    """Écrit un lot d'items dans un fichier de la partition et renvoie sa clé"""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as archive:
+        for item in items:
+            line = json.dumps(item, default=encode_decimal, ensure_ascii=False)
+            archive.write((line + '\n').encode('utf-8'))
+
+    key = f"{partition_prefix(kind, year, month)}{name}.jsonl.gz"
+    s3_client.put_object(
+        Bucket=archive_bucket,
+        Key=key,
+        Body=buffer.getvalue(),
+        ContentType='application/x-ndjson',
+        ContentEncoding='gzip'
+    )
+    return key
+
+def archive_period(query_params):
+    """
+    Paramètres d'une lecture d'archive (year, month, cursor) validés
+    Lève ValueError avec un message destiné au client s'ils sont invalides
+    """
+    year = query_params.get('year')
+    month = query_params.get('month')
+    cursor = query_params.get('cursor')
+
+    if not year:
+        raise ValueError('Year required for archive')
+    if not year.isdigit() or len(year) != 4:
+        raise ValueError('Invalid year')
+    if month and (not month.isdigit() or not 1 <= int(month) <= 12):
+        raise ValueError('Invalid month')
+
+    period = {'year': int(year), 'month': int(month) if month else None}
+    if cursor:
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor))
+            period['cursor'] = (int(position['month']), str(position['key']), int(position['line']))
+        except (ValueError, TypeError, KeyError):
+            raise ValueError('Invalid cursor')
+    return period
+
+def read_archive(kind, year, month=None, limit=MAX_ITEMS, cursor=None):
+    """
+    Relit les items archivés d'un mois (ou de toute l'année si month est absent)
+    Les fichiers sont lus en flux, la lecture s'arrête après `limit` items
+    Renvoie (items, next_cursor) ; next_cursor vaut None si tout a été lu
+    """
+    months = [month] if month else range(1, 13)
+    start_month, start_key, start_line = cursor or (0, '', 0)
+    items = []
+
+    for current_month in months:
+        if current_month < start_month:
+            continue
+        for key in sorted(list_partition(kind, year, current_month)):
+            if (current_month, key) < (start_month, start_key):
+                continue
+            skip = start_line if (current_month, key) == (start_month, start_key) else 0
+            for line, item in enumerate(read_part(key)):
+                if line < skip:
+                    continue
+                if len(items) >= limit:
+                    return items, encode_position(current_month, key, line)
+                items.append(item)
+
+    return items, None
+
+def encode_position(month, key, line):
+    """Curseur opaque : position du prochain item à lire"""
+    position = json.dumps({'month': month, 'key': key, 'line': line})
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('utf-8')
+
+def list_partition(kind, year, month):
+    """Liste les fichiers d'une partition"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=archive_bucket, Prefix=partition_prefix(kind, year, month)):
+        for obj in page.get('Contents', []):
+            yield obj['Key']
+
+def delete_part(key):
+    """Supprime un fichier d'archive"""
+    s3_client.delete_object(Bucket=archive_bucket, Key=key)
+
+def read_part(key):
+    """Lit un fichier d'archive ligne par ligne"""
+    response = s3_client.get_object(Bucket=archive_bucket, Key=key)
+    with gzip.GzipFile(fileobj=response['Body'], mode='rb') as archive:
+        for line in io.TextIOWrapper(archive, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+
+def encode_decimal(value):
+    """Les nombres DynamoDB (Decimal) sont écrits comme des nombres JSON"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
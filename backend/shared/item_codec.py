@@ -0,0 +1,65 @@
+"""
+Compression des longs attributs texte des items DynamoDB
+Au-delà de COMPRESSION_THRESHOLD octets, un texte est stocké en binaire :
+le marqueur de format (MAGIC) suivi des données compressées par zlib
+Les items plus anciens, restés en texte, sont relus sans changement
+"""
+import os
+import zlib
+
+MAGIC = b'DZ1:'
+COMPRESSION_THRESHOLD = int(os.environ.get('COMPRESSION_THRESHOLD', '512'))
+COMPRESSION_LEVEL = 9
+
+# Champs texte stockés compressés (s'ils sont longs), par type d'item :
+# seuls ces champs sont compressés à l'écriture et décompressés à la lecture
+TEXT_FIELDS = {
+    'posts': ['content'],
+    'threads': ['content'],
+    'replies': ['content'],
+    'incidents': ['description'],
+    'incident-notes': ['note'],
+    'access-requests': ['message']
+}
+
+def compress_text(text):
+    """Compresse un texte s'il est assez long et si le gain est réel"""
+    if not isinstance(text, str):
+        return text
+
+    data = text.encode('utf-8')
+    if len(data) < COMPRESSION_THRESHOLD:
+        return text
+
+    compressed = MAGIC + zlib.compress(data, COMPRESSION_LEVEL)
+    return compressed if len(compressed) < len(data) else text
+
+def decompress_text(value):
+    """Relit un texte éventuellement compressé (bytes ou Binary boto3)"""
+    data = getattr(value, 'value', value)
+    if isinstance(data, (bytes, bytearray)) and data.startswith(MAGIC):
+        return zlib.decompress(data[len(MAGIC):]).decode('utf-8')
+    return value
+
+def compress_fields(item, fields):
+    """Copie de l'item avec les champs indiqués compressés (à écrire en base)"""
+    item = dict(item)
+    for field in fields:
+        if field in item:
+            item[field] = compress_text(item[field])
+    return item
+
+def decompress_fields(item, fields):
+    """Décompresse uniquement les champs indiqués (ceux renvoyés au client)"""
+    for field in fields:
+        if field in item:
+            item[field] = decompress_text(item[field])
+    return item
+
+def decompress_item(value):
+    """Décompresse tous les textes compressés, y compris dans les listes et maps"""
+    if isinstance(value, dict):
+        return {name: decompress_item(v) for name, v in value.items()}
+    if isinstance(value, list):
+        return [decompress_item(v) for v in value]
+    return decompress_text(value)
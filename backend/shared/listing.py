@@ -0,0 +1,37 @@
+"""
+Listes courtes de la page d'accueil (derniers posts, prochains événements,
+incidents ouverts, derniers threads) lues sur un index secondaire creux
+Seuls les items à afficher portent l'attribut LISTING_ATTRIBUTE (partition
+constante par table) ; l'index LISTING_INDEX, trié par date, se lit en une
+requête bornée par Limit, quelle que soit la taille de la table
+Partagé (layer Lambda) entre les Lambdas et la Lambda d'archivage
+"""
+from boto3.dynamodb.conditions import Key
+
+LISTING_ATTRIBUTE = 'listing'
+LISTING_INDEX = 'listing-index'
+
+# Partition de chaque liste dans l'index de sa table
+POSTS_LISTING = 'posts'
+EVENTS_LISTING = 'events'
+OPEN_INCIDENTS_LISTING = 'open-incidents'
+THREADS_LISTING = 'threads'
+
+def query_listing(table, listing, sort_key, limit, attributes, newest_first=True, start=None):
+    """
+    Renvoie au plus `limit` items de la liste, triés sur `sort_key`
+    (les plus récents d'abord, ou à partir de `start` dans l'ordre croissant)
+    """
+    key_condition = Key(LISTING_ATTRIBUTE).eq(listing)
+    if start is not None:
+        key_condition = key_condition & Key(sort_key).gte(start)
+
+    response = table.query(
+        IndexName=LISTING_INDEX,
+        KeyConditionExpression=key_condition,
+        ProjectionExpression=', '.join(f"#{name}" for name in attributes),
+        ExpressionAttributeNames={f"#{name}": name for name in attributes},
+        ScanIndexForward=not newest_first,
+        Limit=limit
+    )
+    return response.get('Items', [])
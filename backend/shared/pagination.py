@@ -0,0 +1,56 @@
+"""
+Pagination des requêtes DynamoDB par curseur opaque
+Le curseur est la LastEvaluatedKey de la page précédente, en JSON encodé base64
+Partagé (layer Lambda) entre les notes d'incidents, le fil d'actualité et le tableau de bord
+"""
+import base64
+import binascii
+import json
+
+def page_params(query_params, default_size, max_size, partition, sort_key):
+    """
+    Lit les paramètres limit et cursor d'une requête paginée sur une partition
+    Renvoie (limit, clé de départ ou None) ; lève ValueError avec un message
+    destiné au client si limit n'est pas un entier positif ou si le curseur
+    n'est pas une clé de cette partition
+    """
+    limit = page_limit(query_params, default_size, max_size)
+
+    cursor = query_params.get('cursor')
+    if not cursor:
+        return limit, None
+
+    try:
+        start_key = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, ValueError):
+        raise ValueError('Invalid cursor')
+
+    if (
+        not isinstance(start_key, dict)
+        or set(start_key) != set(partition) | {sort_key}
+        or any(start_key[name] != value for name, value in partition.items())
+        or not isinstance(start_key[sort_key], str)
+    ):
+        raise ValueError('Invalid cursor')
+
+    return limit, start_key
+
+def page_limit(query_params, default_size, max_size):
+    """
+    Lit le paramètre limit (plafonné à max_size) ; lève ValueError si ce
+    n'est pas un entier positif
+    """
+    limit = query_params.get('limit')
+    if limit is None:
+        return default_size
+    if not limit.isdigit() or int(limit) <= 0:
+        raise ValueError('Invalid limit')
+    return min(int(limit), max_size)
+
+def encode_cursor(response):
+    """Curseur de la page suivante (None s'il n'y en a pas)"""
+    if 'LastEvaluatedKey' not in response:
+        return None
+    return base64.urlsafe_b64encode(
+        json.dumps(response['LastEvaluatedKey']).encode('utf-8')
+    ).decode('ascii')
@@ -0,0 +1,66 @@
+"""
+Tests du codec de compression des textes (item_codec.py)
+Usage : python -m pytest tests/test_item_codec.py
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import item_codec
+
+LONG_TEXT = "L'ascenseur du bâtiment B est de nouveau à l'arrêt depuis ce matin. " * 20
+
+class Binary:
+    """Valeur binaire telle que renvoyée par boto3 (boto3.dynamodb.types.Binary)"""
+
+    def __init__(self, value):
+        self.value = value
+
+class ItemCodecTest(unittest.TestCase):
+    def test_long_text_round_trip(self):
+        compressed = item_codec.compress_text(LONG_TEXT)
+
+        self.assertIsInstance(compressed, bytes)
+        self.assertTrue(compressed.startswith(item_codec.MAGIC))
+        self.assertLess(len(compressed), len(LONG_TEXT.encode('utf-8')))
+        self.assertEqual(item_codec.decompress_text(compressed), LONG_TEXT)
+        self.assertEqual(item_codec.decompress_text(Binary(compressed)), LONG_TEXT)
+
+    def test_short_text_is_kept(self):
+        self.assertEqual(item_codec.compress_text('Merci !'), 'Merci !')
+
+    def test_plain_strings_read_unchanged(self):
+        # Items écrits avant la compression : textes en clair
+        self.assertEqual(item_codec.decompress_text(LONG_TEXT), LONG_TEXT)
+        self.assertEqual(item_codec.decompress_text(Binary(b'image')).value, b'image')
+        self.assertIsNone(item_codec.decompress_text(None))
+
+    def test_only_smaller_values_are_kept(self):
+        with mock.patch.object(item_codec, 'COMPRESSION_THRESHOLD', 1):
+            # Texte court : la version compressée (marqueur + en-tête zlib) est plus longue
+            self.assertEqual(item_codec.compress_text('ok'), 'ok')
+
+    def test_fields(self):
+        item = {'postId': 'p1', 'title': LONG_TEXT, 'content': LONG_TEXT}
+        stored = item_codec.compress_fields(item, item_codec.TEXT_FIELDS['posts'])
+
+        self.assertEqual(item['content'], LONG_TEXT)
+        self.assertEqual(stored['title'], LONG_TEXT)
+        self.assertIsInstance(stored['content'], bytes)
+        self.assertEqual(item_codec.decompress_fields(dict(stored), ['content']), item)
+
+    def test_nested_item(self):
+        thread = {
+            'content': item_codec.compress_text(LONG_TEXT),
+            'replies': [{'content': Binary(item_codec.compress_text(LONG_TEXT))}, {'content': 'Oui'}]
+        }
+
+        self.assertEqual(item_codec.decompress_item(thread), {
+            'content': LONG_TEXT,
+            'replies': [{'content': LONG_TEXT}, {'content': 'Oui'}]
+        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests de la Lambda du fil d'actualité (feed/stream_consumer.py) sur des
+enregistrements de flux tels que Lambda les transmet (binaires en base64)
+Usage : python -m pytest tests/test_stream_consumer.py
+"""
+import base64
+import os
+import sys
+import unittest
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BACKEND, 'shared'))
+sys.path.insert(0, os.path.join(BACKEND, 'feed'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-3')
+
+try:
+    import stream_consumer
+except ImportError:  # boto3 absent
+    stream_consumer = None
+
+from item_codec import compress_text
+
+LONG_TEXT = "La réunion du conseil syndical est reportée au jeudi suivant, salle commune. " * 20
+
+def stream_value(text):
+    """Texte long tel qu'il figure dans l'événement Lambda : binaire encodé en base64"""
+    return {'B': base64.b64encode(compress_text(text)).decode('ascii')}
+
+def stream_record(table_name, event_name, new_image, old_image=None):
+    record = {
+        'eventID': 'c4ca4238a0b923820dcc509a6f75849b',
+        'eventName': event_name,
+        'eventVersion': '1.1',
+        'eventSource': 'aws:dynamodb',
+        'awsRegion': 'eu-west-3',
+        'dynamodb': {
+            'ApproximateCreationDateTime': 1767225600,
+            'Keys': {key: new_image[key] for key in ('postId', 'threadId') if key in new_image},
+            'NewImage': new_image,
+            'SequenceNumber': '111',
+            'SizeBytes': 1024,
+            'StreamViewType': 'NEW_AND_OLD_IMAGES'
+        },
+        'eventSourceARN': f"arn:aws:dynamodb:eu-west-3:123456789012:table/{table_name}/stream/2026-01-01T00:00:00.000"
+    }
+    if old_image is not None:
+        record['dynamodb']['OldImage'] = old_image
+    return record
+
+@unittest.skipIf(stream_consumer is None, 'boto3 requis')
+class StreamConsumerTest(unittest.TestCase):
+    def test_post_with_compressed_content(self):
+        record = stream_record(stream_consumer.BLOG_TABLE, 'INSERT', {
+            'postId': {'S': 'p1'},
+            'createdAt': {'N': '1767225600000'},
+            'title': {'S': 'Conseil syndical'},
+            'author': {'S': 'Admin'},
+            'content': stream_value(LONG_TEXT)
+        })
+
+        entry, = stream_consumer.build_entries(record)
+
+        self.assertEqual(entry['type'], 'post')
+        self.assertEqual(entry['excerpt'], LONG_TEXT[:stream_consumer.EXCERPT_LENGTH])
+
+    def test_reply_with_compressed_content(self):
+        thread = {
+            'threadId': {'S': 't1'},
+            'timestamp': {'N': '1767225600000'},
+            'title': {'S': 'Local vélos'},
+            'content': stream_value(LONG_TEXT),
+            'replies': {'L': []}
+        }
+        reply = {'M': {
+            'replyId': {'S': 'r1'},
+            'timestamp': {'N': '1767225700000'},
+            'author': {'S': 'Marie'},
+            'content': stream_value(LONG_TEXT)
+        }}
+        record = stream_record(stream_consumer.NEWSGROUP_TABLE, 'MODIFY',
+                               dict(thread, replies={'L': [reply]}), thread)
+
+        entry, = stream_consumer.build_entries(record)
+
+        self.assertEqual(entry['type'], 'reply')
+        self.assertEqual(entry['ref'], {'threadId': 't1', 'replyId': 'r1'})
+        self.assertEqual(entry['excerpt'], LONG_TEXT[:stream_consumer.EXCERPT_LENGTH])
+
+    def test_binary_sets(self):
+        value = {'BS': [base64.b64encode(b'a').decode('ascii'), base64.b64encode(b'b').decode('ascii')]}
+
+        self.assertEqual(stream_consumer.decode_binary(value), {'BS': [b'a', b'b']})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Commande de migration : ajoute l'attribut listing aux items existants pour
+qu'ils apparaissent dans l'index des listes de la page d'accueil (shared/listing.py)
+Posts, événements et threads non archivés, incidents non résolus ; chaque item
+est mis à jour par une écriture conditionnelle (ignorée si l'item a changé)
+
+Usage : python tools/backfill_listings.py [--tables blog calendar] [--dry-run]
+"""
+import argparse
+import json
+import os
+import sys
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+from listing import (EVENTS_LISTING, LISTING_ATTRIBUTE, OPEN_INCIDENTS_LISTING,
+                     POSTS_LISTING, THREADS_LISTING)
+
+dynamodb = boto3.resource('dynamodb')
+
+# Table : (nom, clé, partition de la liste, condition des items à lister)
+TABLES = {
+    'blog': (os.environ.get('BLOG_TABLE', 'delphinium-blog'),
+             ['postId', 'createdAt'], POSTS_LISTING, None),
+    'calendar': (os.environ.get('CALENDAR_TABLE', 'delphinium-calendar'),
+                 ['eventId', 'eventDate'], EVENTS_LISTING, None),
+    'newsgroup': (os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'),
+                  ['threadId', 'timestamp'], THREADS_LISTING, None),
+    'incidents': (os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents'),
+                  ['incidentId', 'createdAt'], OPEN_INCIDENTS_LISTING, Attr('status').ne('resolved'))
+}
+
+def backfill_table(table_key, dry_run=False):
+    """Ajoute listing aux items de la table qui doivent figurer dans la liste"""
+    table_name, key_names, listing, condition = TABLES[table_key]
+    table = dynamodb.Table(table_name)
+    summary = {'updated': 0, 'skipped': 0}
+
+    filter_expression = Attr(LISTING_ATTRIBUTE).not_exists() & Attr('archivedAt').not_exists()
+    if condition is not None:
+        filter_expression = filter_expression & condition
+    scan_kwargs = {
+        'FilterExpression': filter_expression,
+        'ProjectionExpression': ', '.join(f"#k{index}" for index in range(len(key_names))),
+        'ExpressionAttributeNames': {f"#k{index}": name for index, name in enumerate(key_names)}
+    }
+
+    while True:
+        response = table.scan(**scan_kwargs)
+
+        for item in response.get('Items', []):
+            if dry_run or add_listing(table, item, listing, filter_expression):
+                summary['updated'] += 1
+            else:
+                summary['skipped'] += 1
+
+        if 'LastEvaluatedKey' not in response:
+            return summary
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def add_listing(table, key, listing, condition):
+    """Pose listing si l'item remplit toujours la condition (résolu ou archivé entre-temps sinon)"""
+    try:
+        table.update_item(
+            Key=key,
+            UpdateExpression='SET #listing = :listing',
+            ConditionExpression=condition,
+            ExpressionAttributeNames={'#listing': LISTING_ATTRIBUTE},
+            ExpressionAttributeValues={':listing': listing}
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajout des items existants à l'index des listes de la page d'accueil")
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+    parser.add_argument('--dry-run', action='store_true', help='Compter sans modifier')
+    args = parser.parse_args()
+
+    result = {table_key: backfill_table(table_key, args.dry_run) for table_key in args.tables}
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
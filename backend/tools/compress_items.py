@@ -0,0 +1,137 @@
+"""
+Commande de migration : compresse les longs textes des items existants
+Les tables sont parcourues page par page ; chaque item modifié est réécrit
+par une mise à jour conditionnelle (ignorée si l'item a changé entre-temps)
+
+Usage : python tools/compress_items.py [--tables blog newsgroup] [--dry-run]
+"""
+import argparse
+import json
+import os
+import sys
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+from item_codec import TEXT_FIELDS, compress_fields, compress_text
+
+dynamodb = boto3.resource('dynamodb')
+
+# Table : (nom, clé, champs compressés, listes imbriquées et leurs champs compressés)
+TABLES = {
+    'blog': (os.environ.get('BLOG_TABLE', 'delphinium-blog'),
+             ['postId', 'createdAt'], TEXT_FIELDS['posts'], {}),
+    'newsgroup': (os.environ.get('NEWSGROUP_TABLE', 'delphinium-newsgroup'),
+                  ['threadId', 'timestamp'], TEXT_FIELDS['threads'], {'replies': TEXT_FIELDS['replies']}),
+    'incidents': (os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents'),
+                  ['incidentId', 'createdAt'], TEXT_FIELDS['incidents'], {'notes': TEXT_FIELDS['incident-notes']}),
+    'incident-notes': (os.environ.get('INCIDENT_NOTES_TABLE', 'delphinium-incident-notes'),
+                       ['incidentId', 'noteId'], TEXT_FIELDS['incident-notes'], {}),
+    'access-requests': (os.environ.get('ACCESS_REQUESTS_TABLE', 'delphinium-access-requests'),
+                        ['requestId'], TEXT_FIELDS['access-requests'], {})
+}
+
+def migrate_table(table_key, dry_run=False):
+    """Compresse les champs d'une table et renvoie un résumé"""
+    table_name, key_names, fields, nested = TABLES[table_key]
+    table = dynamodb.Table(table_name)
+    summary = {'scanned': 0, 'updated': 0, 'skipped': 0, 'bytesBefore': 0, 'bytesAfter': 0}
+    scan_kwargs = {}
+
+    while True:
+        response = table.scan(**scan_kwargs)
+
+        for item in response.get('Items', []):
+            summary['scanned'] += 1
+            changes = compressed_changes(item, fields, nested)
+            if not changes:
+                continue
+
+            summary['bytesBefore'] += sum(text_size(item[field]) for field in changes)
+            summary['bytesAfter'] += sum(text_size(value) for value in changes.values())
+
+            if dry_run or update_item(table, key_names, item, changes):
+                summary['updated'] += 1
+            else:
+                summary['skipped'] += 1
+
+        if 'LastEvaluatedKey' not in response:
+            return summary
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def compressed_changes(item, fields, nested):
+    """Champs de l'item dont la version compressée diffère"""
+    changes = {}
+
+    for field in fields:
+        if field not in item:
+            continue
+        compressed = compress_text(item[field])
+        if compressed is not item[field]:
+            changes[field] = compressed
+
+    for list_field, list_fields in nested.items():
+        values = item.get(list_field) or []
+        compressed = [compress_fields(value, list_fields) for value in values]
+        if compressed != values:
+            changes[list_field] = compressed
+
+    return changes
+
+def update_item(table, key_names, item, changes):
+    """
+    Réécrit uniquement les champs modifiés, à condition que l'item n'ait pas changé
+    (même texte pour les champs simples, même nombre d'éléments pour les listes)
+    """
+    names = {}
+    values = {}
+    sets = []
+    conditions = []
+
+    for index, (field, value) in enumerate(changes.items()):
+        names[f"#f{index}"] = field
+        values[f":v{index}"] = value
+        sets.append(f"#f{index} = :v{index}")
+
+        if isinstance(item[field], list):
+            values[f":n{index}"] = len(item[field])
+            conditions.append(f"size(#f{index}) = :n{index}")
+        else:
+            values[f":o{index}"] = item[field]
+            conditions.append(f"#f{index} = :o{index}")
+
+    try:
+        table.update_item(
+            Key={name: item[name] for name in key_names},
+            UpdateExpression='SET ' + ', '.join(sets),
+            ConditionExpression=' AND '.join(conditions),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+def text_size(value):
+    """Taille stockée d'un champ texte, binaire ou liste"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, list):
+        return sum(text_size(v) for element in value for v in element.values())
+    data = getattr(value, 'value', value)
+    return len(data) if isinstance(data, (bytes, bytearray)) else 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Compression des longs textes des items existants')
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+    parser.add_argument('--dry-run', action='store_true', help='Mesurer sans réécrire')
+    args = parser.parse_args()
+
+    result = {table_key: migrate_table(table_key, args.dry_run) for table_key in args.tables}
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
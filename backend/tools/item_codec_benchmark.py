@@ -0,0 +1,191 @@
+"""
+Mesure du gain de la compression des textes (shared/item_codec.py)
+sur un corpus de textes en français typiques du site de la copropriété
+
+Calcule, avant et après compression, la taille stockée des items et les unités
+DynamoDB consommées (1 WCU par Ko écrit, 1 RCU par 4 Ko lus en lecture forte,
+la moitié en lecture éventuellement cohérente, un scan étant facturé sur le total lu)
+
+Usage : python tools/item_codec_benchmark.py [--items 2000] [--threshold 512]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import item_codec
+
+PARAGRAPHS = [
+    "Chers copropriétaires, nous vous informons que les travaux de rénovation de la façade "
+    "côté rue débuteront le lundi 4 mars. L'entreprise installera un échafaudage le long du "
+    "bâtiment A pendant environ six semaines. Merci de ne pas laisser de vélos ni d'objets "
+    "sur les balcons durant cette période et de garder vos fenêtres fermées pendant le "
+    "nettoyage à haute pression.",
+    "L'assemblée générale ordinaire se tiendra le jeudi 18 avril à 19h30 dans la salle "
+    "polyvalente de la résidence. L'ordre du jour comprend l'approbation des comptes de "
+    "l'exercice écoulé, le vote du budget prévisionnel, le renouvellement du contrat du "
+    "syndic ainsi que la présentation des devis pour le remplacement de la chaudière "
+    "collective. Les procurations doivent être remises au conseil syndical avant le 15 avril.",
+    "L'ascenseur du bâtiment B est de nouveau à l'arrêt depuis ce matin. Le technicien de la "
+    "société de maintenance est passé et a diagnostiqué une panne de la carte de commande. "
+    "La pièce a été commandée et devrait être livrée sous dix jours ouvrables. En attendant, "
+    "les résidents à mobilité réduite peuvent contacter le gardien qui organisera une aide "
+    "pour le transport des courses.",
+    "Une fuite d'eau a été constatée au plafond du local vélos, sous l'appartement 12. Le "
+    "plombier est intervenu en urgence et a coupé l'alimentation de la colonne montante "
+    "pendant deux heures. L'origine semble être un joint défectueux au niveau de la "
+    "canalisation d'évacuation. Une déclaration de sinistre a été transmise à l'assureur de "
+    "l'immeuble et un expert passera la semaine prochaine.",
+    "Bonjour à tous, je me permets de relancer la discussion sur l'installation de bornes de "
+    "recharge pour véhicules électriques dans le parking souterrain. Plusieurs voisins sont "
+    "intéressés et il existe des aides financières pour les copropriétés. Serait-il possible "
+    "d'inscrire ce point à l'ordre du jour de la prochaine assemblée générale ?",
+    "Merci pour l'information. Je confirme que le bruit provenait bien de la ventilation "
+    "mécanique contrôlée installée sur le toit. Le réglage effectué hier semble avoir résolu "
+    "le problème, mais je reste attentif et je vous tiendrai au courant si le bourdonnement "
+    "reprend pendant la nuit.",
+    "Le nettoyage des parties communes sera désormais assuré le mardi et le vendredi matin. "
+    "Nous rappelons que les poubelles doivent être déposées dans les conteneurs prévus à cet "
+    "effet et que les encombrants ne peuvent être laissés dans le hall. Un enlèvement des "
+    "encombrants est organisé le premier samedi de chaque mois.",
+    "Je suis propriétaire de l'appartement 27 depuis le mois dernier et je souhaiterais avoir "
+    "accès à l'espace résidents afin de consulter les procès-verbaux des dernières assemblées "
+    "générales, le règlement de copropriété et le carnet d'entretien de l'immeuble. Je reste "
+    "à votre disposition pour tout justificatif.",
+    "Suite au contrôle annuel, le bureau de sécurité a demandé le remplacement de trois "
+    "extincteurs et la mise à jour de la signalisation des issues de secours dans les caves. "
+    "Le devis de la société spécialisée a été validé par le conseil syndical et "
+    "l'intervention est prévue la semaine du 22 mai.",
+    "Rappel : la porte du garage se referme automatiquement après trente secondes. Merci de "
+    "ne pas la bloquer et de vérifier qu'elle est bien fermée après votre passage, plusieurs "
+    "vols de vélos ayant été signalés ces dernières semaines dans le quartier.",
+]
+
+TITLES = [
+    "Travaux de façade", "Assemblée générale", "Panne d'ascenseur", "Fuite dans le local vélos",
+    "Bornes de recharge", "Bruit de ventilation", "Nettoyage des communs", "Demande d'accès",
+    "Contrôle incendie", "Porte du garage",
+]
+
+def generate_corpus(count, seed=42):
+    """Items réalistes : posts, threads, réponses, incidents, notes et demandes"""
+    rng = random.Random(seed)
+    timestamp = int(time.time() * 1000)
+
+    def text(min_paragraphs, max_paragraphs):
+        return '\n\n'.join(rng.sample(PARAGRAPHS, rng.randint(min_paragraphs, max_paragraphs)))
+
+    builders = [
+        ('blog', item_codec.TEXT_FIELDS['posts'], lambda: {
+            'postId': str(uuid.UUID(int=rng.getrandbits(128))), 'title': rng.choice(TITLES),
+            'summary': rng.choice(PARAGRAPHS)[:150], 'content': text(2, 6), 'author': 'Conseil syndical',
+            'category': 'Travaux', 'imageUrl': None, 'createdAt': timestamp
+        }),
+        ('newsgroup', item_codec.TEXT_FIELDS['threads'], lambda: {
+            'threadId': str(uuid.UUID(int=rng.getrandbits(128))), 'title': rng.choice(TITLES),
+            'content': text(1, 3), 'author': 'Résident', 'timestamp': timestamp
+        }),
+        ('reply', item_codec.TEXT_FIELDS['replies'], lambda: {
+            'replyId': str(uuid.UUID(int=rng.getrandbits(128))), 'content': text(1, 1),
+            'author': 'Résident', 'timestamp': timestamp
+        }),
+        ('incidents', item_codec.TEXT_FIELDS['incidents'], lambda: {
+            'incidentId': str(uuid.UUID(int=rng.getrandbits(128))), 'title': rng.choice(TITLES),
+            'description': text(1, 3), 'priority': 'high', 'status': 'open', 'createdAt': timestamp,
+            'createdBy': 'Admin', 'assignedTo': 'Ascenseurs Dupont', 'noteCount': 0
+        }),
+        ('incident-notes', item_codec.TEXT_FIELDS['incident-notes'], lambda: {
+            'incidentId': str(uuid.UUID(int=rng.getrandbits(128))),
+            'noteId': f"{timestamp:013d}#{uuid.UUID(int=rng.getrandbits(128))}",
+            'timestamp': timestamp, 'author': 'Admin', 'note': text(1, 2)
+        }),
+        ('access-requests', item_codec.TEXT_FIELDS['access-requests'], lambda: {
+            'requestId': str(uuid.UUID(int=rng.getrandbits(128))), 'firstName': 'Camille',
+            'lastName': 'Lefèvre', 'email': 'camille.lefevre@example.be', 'phone': '+32 470 12 34 56',
+            'address': 'Avenue des Dauphins 12', 'apartmentNumber': '27', 'userType': 'owner',
+            'companyName': None, 'reason': 'Nouveau propriétaire', 'message': text(1, 2),
+            'status': 'pending', 'createdAt': timestamp
+        }),
+    ]
+
+    for index in range(count):
+        kind, fields, build = builders[index % len(builders)]
+        yield kind, fields, build()
+
+def item_size(item):
+    """Taille d'un item selon les règles de calcul DynamoDB (approximation des nombres)"""
+    size = 0
+    for name, value in item.items():
+        size += len(name.encode('utf-8'))
+        if value is None:
+            size += 1
+        elif isinstance(value, str):
+            size += len(value.encode('utf-8'))
+        elif isinstance(value, (bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, (int, float)):
+            size += 1 + math.ceil(len(str(abs(value)).replace('.', '')) / 2)
+    return size
+
+def run(count):
+    """Compare les tailles et les unités consommées avec et sans compression"""
+    totals = {}
+
+    for kind, fields, item in generate_corpus(count):
+        compressed = item_codec.compress_fields(item, fields)
+        assert item_codec.decompress_fields(dict(compressed), fields) == item
+
+        raw_size = item_size(item)
+        compressed_size = item_size(compressed)
+        stats = totals.setdefault(kind, {
+            'items': 0, 'compressedItems': 0, 'bytes': 0, 'compressedBytes': 0,
+            'wcu': 0, 'compressedWcu': 0, 'rcu': 0, 'compressedRcu': 0
+        })
+        stats['items'] += 1
+        stats['compressedItems'] += compressed != item
+        stats['bytes'] += raw_size
+        stats['compressedBytes'] += compressed_size
+        stats['wcu'] += math.ceil(raw_size / 1024)
+        stats['compressedWcu'] += math.ceil(compressed_size / 1024)
+        stats['rcu'] += math.ceil(raw_size / 4096)
+        stats['compressedRcu'] += math.ceil(compressed_size / 4096)
+
+    total = {key: sum(stats[key] for stats in totals.values()) for key in next(iter(totals.values()))}
+    totals['total'] = total
+
+    for stats in totals.values():
+        stats['storageSaving'] = saving(stats['bytes'], stats['compressedBytes'])
+        stats['writeUnitSaving'] = saving(stats['wcu'], stats['compressedWcu'])
+        stats['getItemReadUnitSaving'] = saving(stats['rcu'], stats['compressedRcu'])
+        # Un scan est facturé sur le volume total lu (eventually consistent : 0,5 RCU par 4 Ko)
+        stats['scanReadUnits'] = round(stats['bytes'] / 4096 / 2, 1)
+        stats['compressedScanReadUnits'] = round(stats['compressedBytes'] / 4096 / 2, 1)
+
+    return totals
+
+def saving(before, after):
+    """Économie en pourcentage"""
+    return f"{(1 - after / before) * 100:.1f}%" if before else '0.0%'
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la compression des textes')
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--threshold', type=int, default=item_codec.COMPRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    item_codec.COMPRESSION_THRESHOLD = args.threshold
+
+    started = time.perf_counter()
+    result = run(args.items)
+    result['total']['elapsedSeconds'] = round(time.perf_counter() - started, 3)
+    result['total']['threshold'] = args.threshold
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Commande de migration : déplace les notes encore stockées dans les incidents
+(liste notes des incidents créés avant la table des notes) vers la table des
+notes, puis ne garde dans l'incident que le compteur noteCount et l'aperçu lastNote
+Les notes déplacées reçoivent un ID déterministe : relancer la commande ne crée
+pas de doublon
+
+Usage : python tools/migrate_incident_notes.py [--dry-run]
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+from item_codec import decompress_text
+
+dynamodb = boto3.resource('dynamodb')
+incidents_table = dynamodb.Table(os.environ.get('INCIDENTS_TABLE', 'delphinium-incidents'))
+notes_table = dynamodb.Table(os.environ.get('INCIDENT_NOTES_TABLE', 'delphinium-incident-notes'))
+
+# Même longueur d'aperçu que incidents/incidents.py
+NOTE_PREVIEW_LENGTH = 200
+MAX_ATTEMPTS = 5
+
+def migrate(dry_run=False):
+    """
+    Migre tous les incidents qui ont encore une liste notes, sauf les incidents
+    archivés : supprimés par le TTL, ils laisseraient leurs notes orphelines
+    """
+    summary = {'incidents': 0, 'notes': 0, 'skipped': 0}
+    scan_kwargs = {'FilterExpression': Attr('notes').exists() & Attr('archivedAt').not_exists()}
+
+    while True:
+        response = incidents_table.scan(**scan_kwargs)
+
+        for incident in response.get('Items', []):
+            if dry_run:
+                moved = len(incident['notes'])
+            else:
+                moved = migrate_incident(incident)
+
+            if moved is None:
+                summary['skipped'] += 1
+            else:
+                summary['incidents'] += 1
+                summary['notes'] += moved
+
+        if 'LastEvaluatedKey' not in response:
+            return summary
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def migrate_incident(incident):
+    """
+    Écrit les notes de l'incident dans la table des notes puis retire la liste
+    Si une note est ajoutée entre la lecture et la mise à jour, l'incident est
+    relu et la mise à jour recommencée ; renvoie le nombre de notes déplacées
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        notes = [
+            legacy_note(incident['incidentId'], index, note)
+            for index, note in enumerate(incident['notes'])
+        ]
+
+        with notes_table.batch_writer(overwrite_by_pkeys=['incidentId', 'noteId']) as batch:
+            for note in notes:
+                batch.put_item(Item=note)
+
+        if update_incident(incident, notes):
+            return len(notes)
+
+        incident = incidents_table.get_item(
+            Key={'incidentId': incident['incidentId'], 'createdAt': incident['createdAt']}
+        ).get('Item')
+        if not incident or 'notes' not in incident or 'archivedAt' in incident:
+            return None
+
+    return None
+
+def legacy_note(incident_id, index, note):
+    """Note de la liste au format de la table des notes (ID stable d'une exécution à l'autre)"""
+    timestamp = int(note.get('timestamp', 0))
+    stable_id = uuid.uuid5(uuid.NAMESPACE_URL, f"delphinium/incidents/{incident_id}/notes/{index}/{timestamp}")
+
+    return {
+        'incidentId': incident_id,
+        'noteId': f"{timestamp:013d}#{stable_id}",
+        'timestamp': timestamp,
+        'author': note.get('author', 'Admin'),
+        'note': note.get('note', '')
+    }
+
+def update_incident(incident, notes):
+    """
+    Retire la liste notes, ajoute ses notes au compteur et met à jour l'aperçu
+    si la plus récente d'entre elles est plus récente que l'aperçu actuel
+    Conditionnel : même liste et même compteur qu'à la lecture
+    """
+    current_count = int(incident.get('noteCount', 0))
+    values = {
+        ':count': current_count + len(notes),
+        ':size': len(incident['notes'])
+    }
+    sets = ['noteCount = :count']
+    conditions = ['size(notes) = :size']
+
+    if 'noteCount' in incident:
+        values[':current'] = incident['noteCount']
+        conditions.append('noteCount = :current')
+    else:
+        conditions.append('attribute_not_exists(noteCount)')
+
+    newest = max(notes, key=lambda note: note['timestamp'], default=None)
+    last_note = incident.get('lastNote') or {}
+    if newest and newest['timestamp'] > int(last_note.get('timestamp', 0)):
+        values[':lastNote'] = {
+            'timestamp': newest['timestamp'],
+            'author': newest['author'],
+            'note': decompress_text(newest['note'])[:NOTE_PREVIEW_LENGTH]
+        }
+        sets.append('lastNote = :lastNote')
+
+    try:
+        incidents_table.update_item(
+            Key={'incidentId': incident['incidentId'], 'createdAt': incident['createdAt']},
+            UpdateExpression='SET ' + ', '.join(sets) + ' REMOVE notes',
+            ConditionExpression=' AND '.join(conditions),
+            ExpressionAttributeValues=values
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Déplacement des notes des incidents vers la table des notes')
+    parser.add_argument('--dry-run', action='store_true', help='Compter sans déplacer')
+    args = parser.parse_args()
+
+    print(json.dumps(migrate(args.dry_run), indent=2))
+
+if __name__ == '__main__':
+    main()